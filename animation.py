@@ -0,0 +1,190 @@
+import threading
+from array import array
+from compact_grid import BARRIER, OPEN, CLOSED, PATH
+from engine import SearchObserver, SearchResult
+
+# Searches are shown by playing them back, not by drawing while they run.
+# A Recorder is given to the search as its observer and stores every cell it colors (opened, expanded or on the
+# path) as one integer: the cell shifted left by 3 bits, with the new state in the low bits.
+# An Animation then applies these events to the grid a few steps per frame, so the time a search takes to watch
+# depends on the number of frames and the chosen speed, not on how long it takes to draw every expansion.
+# A SearchThread runs the search on a worker thread, so the window keeps handling its events while the search runs:
+# the Animation plays the events back as they are recorded, and the Recorder pauses or cancels the search between
+# two expansions when asked to.
+
+_STATE_BITS = 3
+_STATE_MASK = (1 << _STATE_BITS) - 1
+
+class SearchCancelled(Exception):
+    """
+    Raised inside a search by its Recorder to stop it, after cancel() was called.
+    """
+
+class Recorder(SearchObserver):
+    def __init__(self, start: int, end: int):
+        """
+        Records the cells colored by a search, to play them back later with an Animation.
+        Args:
+            start (int): The starting cell (never recolored).
+            end (int): The ending cell (never recolored).
+        """
+        self.start: int = start
+        self.end: int = end
+        self.events: array = array('q')
+        self.result: SearchResult | None = None
+        self.cancelled: bool = False
+        self._running = threading.Event()  # cleared while the search is paused
+        self._running.set()
+
+    def pause(self) -> None:
+        """
+        Make the search wait before its next expansion, until resume() or cancel() is called.
+        Returns:
+            None
+        """
+        self._running.clear()
+
+    def resume(self) -> None:
+        """
+        Let a paused search go on.
+        Returns:
+            None
+        """
+        self._running.set()
+
+    def cancel(self) -> None:
+        """
+        Stop the search at its next expansion (it raises SearchCancelled), even if it is paused.
+        Returns:
+            None
+        """
+        self.cancelled = True
+        self._running.set()
+
+    def on_open(self, cell: int) -> None:
+        if cell != self.start and cell != self.end:
+            self.events.append(cell << _STATE_BITS | OPEN)
+
+    def on_expand(self, cell: int) -> None:
+        if cell != self.start and cell != self.end:
+            self.events.append(cell << _STATE_BITS | CLOSED)
+        self._running.wait()
+        if self.cancelled:
+            raise SearchCancelled()
+
+    def on_path(self, cell: int) -> None:
+        if cell != self.start and cell != self.end:
+            self.events.append(cell << _STATE_BITS | PATH)
+
+    def on_finish(self, result: SearchResult) -> None:
+        self.result = result
+
+class SearchThread:
+    def __init__(self, search: callable, recorder: Recorder):
+        """
+        Runs a search on a daemon worker thread, recording its steps.
+        Args:
+            search (callable): Runs the search with the observer it is given, and returns its SearchResult.
+            recorder (Recorder): The observer of the search.
+        """
+        self.recorder: Recorder = recorder
+        self.result: SearchResult | None = None
+        self.error: Exception | None = None  # raised by the search, if it failed
+        self._thread = threading.Thread(target=self._run, args=(search,), daemon=True)
+        self._thread.start()
+
+    def _run(self, search: callable) -> None:
+        try:
+            self.result = search(self.recorder)
+        except SearchCancelled:
+            pass
+        except Exception as error:
+            self.error = error
+
+    @property
+    def finished(self) -> bool:
+        return not self._thread.is_alive()
+
+    def cancel(self) -> None:
+        """
+        Stop the search and wait for its thread to end.
+        Returns:
+            None
+        """
+        self.recorder.cancel()
+        self._thread.join()
+
+class Animation:
+    def __init__(self, grid, events: array, task: SearchThread | None = None):
+        """
+        Plays the events of a Recorder back on a grid.
+        Args:
+            grid (Grid): The grid to color. Its `dirty` set (see grid.py) receives every recolored cell, if it has one.
+            events (array): The events recorded by a Recorder (they may still be recorded while they are played).
+            task (SearchThread | None): The search still recording the events, if any.
+        """
+        self.grid = grid
+        self.events: array = events
+        self.task: SearchThread | None = task
+        self.position: int = 0  # the index of the next event to apply
+
+    @property
+    def done(self) -> bool:
+        # once the search is finished no event can be added, so it is checked before the events
+        finished = self.task is None or self.task.finished
+        return finished and self.position >= len(self.events)
+
+    def pause(self) -> None:
+        """
+        Pause the search, if it is still running (the caller stops calling advance() to pause the playback).
+        Returns:
+            None
+        """
+        if self.task is not None:
+            self.task.recorder.pause()
+
+    def resume(self) -> None:
+        """
+        Let a paused search go on.
+        Returns:
+            None
+        """
+        if self.task is not None:
+            self.task.recorder.resume()
+
+    def cancel(self) -> None:
+        """
+        Stop the search, if it is still running, and wait for it to end.
+        Returns:
+            None
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+    def advance(self, steps: int | None) -> None:
+        """
+        Apply the next events to the grid.
+        Args:
+            steps (int | None): How many cells to expand or add to the path (the cells opened along with them come for
+                free), or None to apply every remaining event at once.
+        Returns:
+            None
+        """
+        events, state = self.events, self.grid.state
+        dirty = getattr(self.grid, 'dirty', None)
+        position, count = self.position, len(self.events)
+        budget = count if steps is None else steps
+
+        while position < count and budget > 0:
+            event = events[position]
+            position += 1
+            cell, cell_state = event >> _STATE_BITS, event & _STATE_MASK
+            if cell_state != OPEN:
+                budget -= 1
+            # any-angle segments may touch the corner of a barrier: keep it
+            if cell_state == PATH and state[cell] == BARRIER:
+                continue
+            state[cell] = cell_state
+            if dirty is not None:
+                dirty.add(cell)
+        self.position = position
@@ -0,0 +1,219 @@
+from math import sqrt
+from compact_grid import BARRIER
+from engine import SearchObserver, SearchResult, h_euclidian_distance, _disconnected, _not_found
+from open_list import OpenList
+from scratch import SearchScratch, score_tables
+
+# Any-angle path planning: the path is a list of waypoints joined by straight segments that may go in any
+# direction, instead of a chain of grid moves, so it has no staircases and is shorter.
+# Theta* is A* where a cell can take the parent of its parent as its own parent whenever the straight segment
+# between them is not blocked (line of sight); Lazy Theta* assumes line of sight when a cell is opened and only
+# checks it when the cell is expanded, which needs far fewer checks.
+# Segments join cell centers. A segment is blocked by every barrier it goes through; where it passes exactly
+# through the corner of four cells, it follows the corner cutting rule of diagonal moves.
+
+def line_of_sight(grid, a: int, b: int) -> bool:
+    """
+    Checks if the straight segment between the centers of two cells goes through no barrier.
+    It walks every cell the segment touches (a supercover line), with integer steps only.
+    Args:
+        grid (CompactGrid): The grid.
+        a (int): The first cell.
+        b (int): The second cell.
+    Returns:
+        bool: True if no barrier blocks the segment.
+    """
+    state = grid.state
+    if state[a] == BARRIER:
+        return False
+    cols = grid.cols
+    row, col = divmod(a, cols)
+    end_row, end_col = divmod(b, cols)
+    d_row, d_col = abs(end_row - row), abs(end_col - col)
+    step_row = 1 if end_row > row else -1
+    step_col = 1 if end_col > col else -1
+    # the sign of `error` tells whether the segment leaves the current cell through a row edge, a column edge or a corner
+    error = d_col - d_row
+    d_row, d_col = 2 * d_row, 2 * d_col
+    remaining = (d_row + d_col) // 2
+
+    while remaining > 0:
+        if error > 0:
+            col += step_col
+            error -= d_row
+        elif error < 0:
+            row += step_row
+            error += d_col
+        else:
+            # the segment goes exactly through a corner: check the two cells it touches there
+            side_a = state[(row + step_row) * cols + col] != BARRIER
+            side_b = state[row * cols + col + step_col] != BARRIER
+            if not (side_a or side_b) if grid.corner_cutting else not (side_a and side_b):
+                return False
+            row += step_row
+            col += step_col
+            error += d_col - d_row
+            remaining -= 1
+        remaining -= 1
+        if state[row * cols + col] == BARRIER:
+            return False
+    return True
+
+def segment_cells(grid, a: int, b: int) -> list[int]:
+    """
+    Get the cells a straight segment between two cell centers goes through, to draw it on the grid.
+    Args:
+        grid (CompactGrid): The grid.
+        a (int): The first cell.
+        b (int): The second cell.
+    Returns:
+        list[int]: The cells from a to b (through corners, both touched cells are included).
+    """
+    cols = grid.cols
+    row, col = divmod(a, cols)
+    end_row, end_col = divmod(b, cols)
+    d_row, d_col = abs(end_row - row), abs(end_col - col)
+    step_row = 1 if end_row > row else -1
+    step_col = 1 if end_col > col else -1
+    error = d_col - d_row
+    d_row, d_col = 2 * d_row, 2 * d_col
+    remaining = (d_row + d_col) // 2
+
+    cells = [a]
+    while remaining > 0:
+        if error > 0:
+            col += step_col
+            error -= d_row
+        elif error < 0:
+            row += step_row
+            error += d_col
+        else:
+            cells.extend(((row + step_row) * cols + col, row * cols + col + step_col))
+            row += step_row
+            col += step_col
+            error += d_col - d_row
+            remaining -= 1
+        remaining -= 1
+        cells.append(row * cols + col)
+    return cells
+
+def _distance(position: callable, a: int, b: int) -> float:
+    row_a, col_a = position(a)
+    row_b, col_b = position(b)
+    return sqrt((row_a - row_b) ** 2 + (col_a - col_b) ** 2)
+
+def theta_star(grid, start: int, end: int, observer: SearchObserver | None = None,
+               scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Theta* Algorithm: any-angle A* with a line-of-sight check for every opened cell.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs (of every cell the segments go through).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The waypoints of the path (see segment_cells for the cells between them), its Euclidean length
+        and the number of expanded cells.
+    Raises:
+        ValueError: If some cells of the grid cost more than others (segments are measured by their length only).
+    """
+    return _theta_star(grid, start, end, False, observer, scratch)
+
+def lazy_theta_star(grid, start: int, end: int, observer: SearchObserver | None = None,
+                    scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Lazy Theta* Algorithm: any-angle A* that checks line of sight only when a cell is expanded.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs (of every cell the segments go through).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The waypoints of the path (see segment_cells for the cells between them), its Euclidean length
+        and the number of expanded cells.
+    Raises:
+        ValueError: If some cells of the grid cost more than others (segments are measured by their length only).
+    """
+    return _theta_star(grid, start, end, True, observer, scratch)
+
+def _theta_star(grid, start: int, end: int, lazy: bool, observer: SearchObserver | None,
+                scratch: SearchScratch | None) -> SearchResult:
+    """
+    The search shared by Theta* and Lazy Theta*.
+    """
+    if not grid.is_uniform():
+        raise ValueError("any-angle planning needs a grid where every move costs the same")
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+
+    position = grid.position
+    moves = grid.moves
+    end_position = position(end)
+
+    open_list = OpenList()
+    open_list.push(start, h_euclidian_distance(position(start), end_position))
+    g_score, came_from = score_tables(start, scratch)
+    closed = set()
+    expanded = 0
+
+    while open_list:
+        current, _ = open_list.pop()
+        closed.add(current)
+
+        parent = came_from.get(current)
+        if lazy and parent is not None and not line_of_sight(grid, parent, current):
+            # the optimistic parent is not visible: fall back to the best expanded neighbor
+            best = min((neighbor for neighbor, _ in moves(current) if neighbor in closed),
+                       key=lambda neighbor: g_score[neighbor] + _distance(position, neighbor, current))
+            came_from[current] = best
+            g_score[current] = g_score[best] + _distance(position, best, current)
+
+        if current == end:
+            return _finish(grid, observer, came_from, start, end, g_score[end], expanded)
+
+        expanded += 1
+        current_g_score = g_score[current]
+        parent = came_from.get(current)
+        for neighbor, length in moves(current):
+            if neighbor in closed:
+                continue
+            # path 2 of Theta*: straight from the parent of the current cell, if it can be seen (or is assumed to)
+            if parent is not None and (lazy or line_of_sight(grid, parent, neighbor)):
+                source, tentative_g_score = parent, g_score[parent] + _distance(position, parent, neighbor)
+            else:
+                source, tentative_g_score = current, current_g_score + length
+            if tentative_g_score < g_score.get(neighbor, float('inf')):
+                came_from[neighbor] = source
+                g_score[neighbor] = tentative_g_score
+                open_list.push(neighbor, tentative_g_score + h_euclidian_distance(position(neighbor), end_position))
+                if observer is not None:
+                    observer.on_open(neighbor)
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    result = SearchResult(False, [], float('inf'), expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+def _finish(grid, observer: SearchObserver | None, came_from: dict, start: int, end: int, cost: float,
+            expanded: int) -> SearchResult:
+    """
+    Build the result from the waypoints. The observer is told about every cell the segments go through.
+    """
+    path = [end]
+    while path[-1] != start:
+        waypoint = came_from[path[-1]]
+        if observer is not None:
+            for cell in reversed(segment_cells(grid, waypoint, path[-1])[:-1]):
+                observer.on_path(cell)
+        path.append(waypoint)
+    path.reverse()
+
+    result = SearchResult(True, path, cost, expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
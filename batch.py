@@ -0,0 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from time import perf_counter
+import engine
+from engine import SearchResult
+from compact_grid import CompactGrid
+from scratch import SearchScratch
+
+class BatchResult:
+    def __init__(self, results: list[SearchResult], elapsed: float):
+        """
+        The outcome of a batch of queries.
+        Args:
+            results (list[SearchResult]): The result of every query, in the order of the queries.
+            elapsed (float): The wall time spent solving the batch, in seconds.
+        """
+        self.results: list[SearchResult] = results
+        self.elapsed: float = elapsed
+
+    @property
+    def queries_per_second(self) -> float:
+        """
+        The throughput of the batch.
+        """
+        return len(self.results) / self.elapsed if self.elapsed > 0 else float('inf')
+
+    def __repr__(self) -> str:
+        found = sum(1 for result in self.results if result)
+        return (f"BatchResult(queries={len(self.results)}, found={found}, "
+                f"elapsed={self.elapsed:.3f}s, queries_per_second={self.queries_per_second:.1f})")
+
+def solve_batch(grid, queries: list[tuple[int, int]], algorithm: callable = engine.astar, **options) -> BatchResult:
+    """
+    Solve many (start, end) queries on the same grid, headless.
+    The work that does not depend on the query is done once for the whole batch: the adjacency mask
+    of the grid is built (if it was not already) and one SearchScratch is reused by every search.
+    Args:
+        grid (CompactGrid): The grid to search.
+        queries (list[tuple[int, int]]): The (start, end) cell indices of every query.
+        algorithm (callable): The engine search to run (bfs, dfs, astar, ucs, dijkstra, dls or ids).
+        **options: Extra arguments given to the algorithm, e.g. queue_type=BucketQueue or limit=100.
+    Returns:
+        BatchResult: The results in the order of the queries, and the throughput.
+    """
+    if grid.adjacency is None:
+        grid.build_adjacency()
+    scratch = SearchScratch(grid.rows * grid.cols)
+
+    began = perf_counter()
+    results = [algorithm(grid, start, end, scratch=scratch, **options) for start, end in queries]
+    return BatchResult(results, perf_counter() - began)
+
+# ---- Parallel execution ----
+def share_grid(grid) -> shared_memory.SharedMemory:
+    """
+    Copy the state plane, then the cost plane, of a grid into a new block of shared memory.
+    The caller must close and unlink the block once the workers are done with it.
+    Args:
+        grid (CompactGrid): The grid to share.
+    Returns:
+        shared_memory.SharedMemory: The block holding both planes.
+    """
+    size = grid.rows * grid.cols
+    memory = shared_memory.SharedMemory(create=True, size=max(2 * size, 1))
+    memory.buf[:size] = grid.state
+    memory.buf[size:2 * size] = grid.cost
+    return memory
+
+def attach_grid(memory_name: str, rows: int, cols: int, connectivity: int,
+                corner_cutting: bool) -> tuple[shared_memory.SharedMemory, CompactGrid]:
+    """
+    Attach to a grid shared by share_grid, from a worker process.
+    Args:
+        memory_name (str): The name of the shared memory block holding the state plane, then the cost plane.
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        connectivity (int): The connectivity of the grid (4 or 8).
+        corner_cutting (bool): The corner cutting rule of the grid.
+    Returns:
+        tuple[shared_memory.SharedMemory, CompactGrid]: The attached block (kept open while the grid is used) and
+        a grid on top of its planes, with its adjacency mask built.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    size = rows * cols
+    grid = CompactGrid.from_state(rows, cols, memory.buf[:size], memory.buf[size:2 * size])
+    grid.set_connectivity(connectivity, corner_cutting)
+    grid.build_adjacency()
+    return memory, grid
+
+# Every worker process attaches to the grid's state plane in shared memory once, when it starts,
+# and keeps its own grid view and scratch storage in these globals for all the chunks it solves.
+_worker_memory = None
+_worker_grid = None
+_worker_scratch = None
+_worker_algorithm = None
+_worker_options = None
+
+def _init_worker(memory_name: str, rows: int, cols: int, connectivity: int, corner_cutting: bool, algorithm: callable,
+                 options: dict) -> None:
+    """
+    Prepare a worker process: attach to the shared state and cost planes and build the per-process storage.
+    Args:
+        memory_name (str): The name of the shared memory block holding the state plane, then the cost plane.
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        connectivity (int): The connectivity of the grid (4 or 8).
+        corner_cutting (bool): The corner cutting rule of the grid.
+        algorithm (callable): The engine search to run.
+        options (dict): Extra arguments given to the algorithm.
+    Returns:
+        None
+    """
+    global _worker_memory, _worker_grid, _worker_scratch, _worker_algorithm, _worker_options
+    _worker_memory, _worker_grid = attach_grid(memory_name, rows, cols, connectivity, corner_cutting)
+    _worker_scratch = SearchScratch(rows * cols)
+    _worker_algorithm = algorithm
+    _worker_options = options
+
+def _solve_chunk(queries: list[tuple[int, int]]) -> list[SearchResult]:
+    """
+    Solve a chunk of queries in a worker process.
+    Args:
+        queries (list[tuple[int, int]]): The (start, end) cell indices of the queries.
+    Returns:
+        list[SearchResult]: The results, in the order of the queries.
+    """
+    return [_worker_algorithm(_worker_grid, start, end, scratch=_worker_scratch, **_worker_options)
+            for start, end in queries]
+
+def solve_parallel(grid, queries: list[tuple[int, int]], algorithm: callable = engine.astar,
+                   workers: int | None = None, chunk_size: int | None = None, **options) -> BatchResult:
+    """
+    Solve many (start, end) queries on the same grid, sharded across a pool of worker processes.
+    The state and cost planes are copied once into shared memory, which every worker attaches to, so only the
+    queries and the results travel between processes. The results are merged in the order of the queries.
+    Args:
+        grid (CompactGrid): The grid to search.
+        queries (list[tuple[int, int]]): The (start, end) cell indices of every query.
+        algorithm (callable): The engine search to run; it must be a module-level function, like those of engine.py.
+        workers (int | None): The number of worker processes (defaults to the number of CPUs).
+        chunk_size (int | None): The number of queries sent to a worker at a time (defaults to about 4 chunks per worker).
+        **options: Extra arguments given to the algorithm, e.g. queue_type=BucketQueue or limit=100.
+    Returns:
+        BatchResult: The results in the order of the queries, and the throughput.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(queries) // (workers * 4)))
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+
+    memory = share_grid(grid)
+    try:
+        began = perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(memory.name, grid.rows, grid.cols, grid.connectivity, grid.corner_cutting,
+                                           algorithm, options)) as executor:
+            results = [result for chunk in executor.map(_solve_chunk, chunks) for result in chunk]
+        return BatchResult(results, perf_counter() - began)
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,401 @@
+from math import sqrt
+
+# states of a cell, stored as one byte per cell in CompactGrid.state
+UNVISITED = 0
+BARRIER = 1
+START = 2
+END = 3
+OPEN = 4
+CLOSED = 5
+PATH = 6
+
+# bits of the adjacency mask: a bit is set when the neighbor in that direction exists and can be moved to
+DOWN = 1
+UP = 2
+RIGHT = 4
+LEFT = 8
+# diagonal directions, only used by 8-connected grids
+DOWN_RIGHT = 16
+DOWN_LEFT = 32
+UP_RIGHT = 64
+UP_LEFT = 128
+
+# the length of a diagonal move (an orthogonal move has length 1)
+SQRT2 = sqrt(2)
+
+# the cost of moving into a cell, stored as one byte per cell in CompactGrid.cost
+DEFAULT_COST = 1
+MAX_COST = 255
+
+# the name of every state, matching the keys of COLORS2 in utils.py
+STATE_NAMES = ('UNVISITED', 'BARRIER', 'START', 'END', 'OPEN', 'CLOSED', 'PATH')
+
+# maps every state to itself, except the colors left by a search (OPEN, CLOSED, PATH) which become UNVISITED
+_LAYOUT_STATES = bytes(UNVISITED if state in (OPEN, CLOSED, PATH) else state for state in range(256))
+
+class CompactGrid:
+    def __init__(self, rows: int, cols: int, connectivity: int = 4, corner_cutting: bool = False):
+        """
+        A grid stored as a flat state plane of one byte per cell. It does not depend on pygame,
+        so it can be used to run the search engine headless.
+        A cell is identified by its flat index: cell = row * cols + col.
+        Args:
+            rows (int): Number of rows in the grid.
+            cols (int): Number of columns in the grid.
+            connectivity (int): 4 to move orthogonally only, or 8 to also move diagonally (see set_connectivity).
+            corner_cutting (bool): On an 8-connected grid, allow diagonal moves past the corner of one barrier.
+        """
+        self.rows: int = rows
+        self.cols: int = cols
+        self.state: bytearray = bytearray(rows * cols)  # every cell starts UNVISITED (0)
+        # the cost of moving into every cell (DEFAULT_COST to MAX_COST), used by the weighted searches
+        self.cost: bytearray = bytearray([DEFAULT_COST]) * (rows * cols)
+        self._weighted_cells: int = 0  # the number of cells whose cost is not DEFAULT_COST
+        # bumped whenever a barrier is painted or erased or a cost changes, so results computed on an older layout can be recognized
+        self.version: int = 0
+        # functions called with the cell whenever a barrier is painted or erased or a cost changes (with None when the
+        # whole grid is reset), so that structures derived from the layout can repair themselves incrementally
+        self.barrier_listeners: list[callable] = []
+        # optional ComponentIndex (components.py): when attached, searches between disconnected cells stop at once
+        self.components = None
+        # optional adjacency mask per cell (one bit per direction), see build_adjacency()
+        self.adjacency: bytearray | None = None
+        self.connectivity: int = 4
+        self.corner_cutting: bool = False
+        # the index offset of each direction, and the offsets (and move lengths) selected by each of the 256 masks
+        self._offsets: dict[int, int] = {DOWN: cols, UP: -cols, RIGHT: 1, LEFT: -1,
+                                         DOWN_RIGHT: cols + 1, DOWN_LEFT: cols - 1, UP_RIGHT: 1 - cols, UP_LEFT: -cols - 1}
+        self._mask_offsets: tuple = tuple(
+            tuple(offset for bit, offset in self._offsets.items() if mask & bit) for mask in range(256)
+        )
+        self._mask_moves: tuple = tuple(
+            tuple((offset, 1 if bit <= LEFT else SQRT2) for bit, offset in self._offsets.items() if mask & bit)
+            for mask in range(256)
+        )
+        if connectivity != 4 or corner_cutting:
+            self.set_connectivity(connectivity, corner_cutting)
+
+    @classmethod
+    def from_state(cls, rows: int, cols: int, state, cost=None) -> "CompactGrid":
+        """
+        Create a grid on top of an existing state plane, without copying it (e.g. a shared memory buffer).
+        Args:
+            rows (int): Number of rows in the grid.
+            cols (int): Number of columns in the grid.
+            state: A writable buffer of rows * cols bytes (bytearray or memoryview).
+            cost: An optional writable buffer of rows * cols bytes holding the cost plane (every cost is DEFAULT_COST if None).
+        Returns:
+            CompactGrid: The grid using `state` as its state plane.
+        """
+        grid = cls(0, cols)  # no rows: the empty planes are replaced just below
+        grid.rows = rows
+        grid.state = state
+        if cost is None:
+            grid.cost = bytearray([DEFAULT_COST]) * (rows * cols)
+        else:
+            grid.cost = cost
+            grid._weighted_cells = rows * cols - bytes(cost).count(DEFAULT_COST)
+        return grid
+
+    # ---- Cell indices ----
+    def index(self, row: int, col: int) -> int:
+        """
+        Get the flat index of a cell.
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+        Returns:
+            int: The index of the cell in the state plane.
+        """
+        return row * self.cols + col
+
+    def position(self, cell: int) -> tuple[int, int]:
+        """
+        Get the (row, col) position of a cell.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            tuple[int, int]: The row and column of the cell.
+        """
+        return divmod(cell, self.cols)
+
+    # ---- State of the cells ----
+    def get_state(self, cell: int) -> int:
+        """
+        Get the state of a cell (one of UNVISITED, BARRIER, START, END, OPEN, CLOSED, PATH).
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            int: The state of the cell.
+        """
+        return self.state[cell]
+
+    def set_state(self, cell: int, state: int) -> None:
+        """
+        Set the state of a cell. Painting or erasing a barrier must go through here, so that the version
+        is bumped, the adjacency mask (if it was built) stays up to date and the barrier listeners are notified.
+        Args:
+            cell (int): The index of the cell.
+            state (int): The new state of the cell.
+        Returns:
+            None
+        """
+        was_barrier = self.state[cell] == BARRIER
+        self.state[cell] = state
+        if was_barrier != (state == BARRIER):
+            self.version += 1
+            if self.adjacency is not None:
+                self._update_adjacency(cell)
+            for listener in self.barrier_listeners:
+                listener(cell)
+
+    def is_barrier(self, cell: int) -> bool:
+        """
+        Checks if a cell is a barrier.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            bool: True if the cell is a barrier, False otherwise.
+        """
+        return self.state[cell] == BARRIER
+
+    def set_barrier(self, row: int, col: int) -> None:
+        """
+        Make the cell at (row, col) a barrier.
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+        Returns:
+            None
+        """
+        self.set_state(self.index(row, col), BARRIER)
+
+    def get_cost(self, cell: int) -> int:
+        """
+        Get the cost of moving into a cell.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            int: The cost of the cell.
+        """
+        return self.cost[cell]
+
+    def set_cost(self, cell: int, cost: int) -> None:
+        """
+        Set the cost of moving into a cell. Like a barrier change, a new cost bumps the version
+        and notifies the barrier listeners.
+        Args:
+            cell (int): The index of the cell.
+            cost (int): The new cost, from DEFAULT_COST (1) to MAX_COST (255).
+        Returns:
+            None
+        Raises:
+            ValueError: If the cost is out of range.
+        """
+        if not DEFAULT_COST <= cost <= MAX_COST:
+            raise ValueError(f"the cost of a cell must be between {DEFAULT_COST} and {MAX_COST}, not {cost}")
+        previous = self.cost[cell]
+        if previous == cost:
+            return
+        self.cost[cell] = cost
+        self._weighted_cells += (cost != DEFAULT_COST) - (previous != DEFAULT_COST)
+        self.version += 1
+        for listener in self.barrier_listeners:
+            listener(cell)
+
+    def is_uniform(self) -> bool:
+        """
+        Checks if every move of the grid costs the same (no cell has a cost other than DEFAULT_COST).
+        Returns:
+            bool: True if the grid is uniform, False if it has weighted cells.
+        """
+        return self._weighted_cells == 0
+
+    def state_array(self):
+        """
+        Get the state plane as a 2D NumPy uint8 array of shape (rows, cols).
+        The array shares its memory with the grid, so no data is copied. Requires NumPy.
+        Returns:
+            numpy.ndarray: A view of the state plane.
+        """
+        import numpy as np
+        return np.frombuffer(self.state, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    # ---- Connectivity ----
+    def set_connectivity(self, connectivity: int, corner_cutting: bool = False) -> None:
+        """
+        Choose how agents move. On a 4-connected grid they only move orthogonally. On an 8-connected grid they
+        also move diagonally, with a move length of sqrt(2); a diagonal move is never allowed between two barriers
+        touching by their corners, and past the corner of a single barrier only if `corner_cutting` is True.
+        Structures derived from the layout are notified as if the whole grid was reset.
+        Args:
+            connectivity (int): 4 or 8.
+            corner_cutting (bool): Allow diagonal moves past the corner of one barrier.
+        Returns:
+            None
+        Raises:
+            ValueError: If the connectivity is not 4 or 8.
+        """
+        if connectivity not in (4, 8):
+            raise ValueError(f"the connectivity of a grid must be 4 or 8, not {connectivity}")
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.version += 1
+        if self.adjacency is not None:
+            self.build_adjacency()
+        for listener in self.barrier_listeners:
+            listener(None)
+
+    def is_diagonal(self, cell: int, neighbor: int) -> bool:
+        """
+        Checks if the move between two adjacent cells is diagonal.
+        Args:
+            cell (int): The index of the first cell.
+            neighbor (int): The index of the second cell.
+        Returns:
+            bool: True if the cells are neither on the same row nor on the same column.
+        """
+        return cell // self.cols != neighbor // self.cols and cell % self.cols != neighbor % self.cols
+
+    # ---- Adjacency mask ----
+    def _mask(self, cell: int) -> int:
+        """
+        Compute the adjacency mask of a cell from the state plane.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            int: One bit per direction the cell can move to.
+        """
+        state = self.state
+        cols = self.cols
+        row, col = divmod(cell, cols)
+        has_down, has_up, has_right, has_left = row < self.rows - 1, row > 0, col < cols - 1, col > 0
+        down = has_down and state[cell + cols] != BARRIER
+        up = has_up and state[cell - cols] != BARRIER
+        right = has_right and state[cell + 1] != BARRIER
+        left = has_left and state[cell - 1] != BARRIER
+        mask = down * DOWN | up * UP | right * RIGHT | left * LEFT
+        if self.connectivity == 8:
+            # a diagonal move goes past the two orthogonal cells next to it: both must be free, or one with corner cutting
+            passes = (lambda a, b: a or b) if self.corner_cutting else (lambda a, b: a and b)
+            if has_down and has_right and state[cell + cols + 1] != BARRIER and passes(down, right):
+                mask |= DOWN_RIGHT
+            if has_down and has_left and state[cell + cols - 1] != BARRIER and passes(down, left):
+                mask |= DOWN_LEFT
+            if has_up and has_right and state[cell - cols + 1] != BARRIER and passes(up, right):
+                mask |= UP_RIGHT
+            if has_up and has_left and state[cell - cols - 1] != BARRIER and passes(up, left):
+                mask |= UP_LEFT
+        return mask
+
+    def build_adjacency(self) -> None:
+        """
+        Precompute the adjacency mask of every cell. Once built, it is updated incrementally
+        by set_state() whenever a barrier is painted or erased, and neighbors() reads it instead of the state plane.
+        Returns:
+            None
+        """
+        self.adjacency = bytearray(self._mask(cell) for cell in range(self.rows * self.cols))
+
+    def _update_adjacency(self, cell: int) -> None:
+        """
+        Update the masks around a cell after it became (or stopped being) a barrier. On an 8-connected grid
+        this includes the diagonal moves that go past the cell.
+        Args:
+            cell (int): The index of the cell that changed.
+        Returns:
+            None
+        """
+        adjacency = self.adjacency
+        for neighbor in self.around(cell):
+            adjacency[neighbor] = self._mask(neighbor)
+
+    # ---- Search ----
+    def around(self, cell: int) -> list[int]:
+        """
+        Get every cell next to a cell, barriers included (diagonal ones too on an 8-connected grid).
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            list[int]: The indices of the adjacent cells inside the grid.
+        """
+        row, col = divmod(cell, self.cols)
+        has_down, has_up, has_right, has_left = row < self.rows - 1, row > 0, col < self.cols - 1, col > 0
+        cells = []
+        if has_down:
+            cells.append(cell + self.cols)
+        if has_up:
+            cells.append(cell - self.cols)
+        if has_right:
+            cells.append(cell + 1)
+        if has_left:
+            cells.append(cell - 1)
+        if self.connectivity == 8:
+            if has_down and has_right:
+                cells.append(cell + self.cols + 1)
+            if has_down and has_left:
+                cells.append(cell + self.cols - 1)
+            if has_up and has_right:
+                cells.append(cell - self.cols + 1)
+            if has_up and has_left:
+                cells.append(cell - self.cols - 1)
+        return cells
+
+    def neighbors(self, cell: int) -> list[int]:
+        """
+        Get the walkable neighbors of a cell. They are generated on demand, from the adjacency mask
+        if it was built, otherwise from the state plane; nothing is stored per cell.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            list[int]: The indices of the neighbor cells that are not barriers.
+        """
+        mask = self.adjacency[cell] if self.adjacency is not None else self._mask(cell)
+        return [cell + offset for offset in self._mask_offsets[mask]]
+
+    def moves(self, cell: int) -> list[tuple[int, float]]:
+        """
+        Get the walkable neighbors of a cell with the length of the move to each: 1 orthogonally,
+        sqrt(2) diagonally. The cost of a move is its length times the cost of the cell it enters.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            list[tuple[int, float]]: The (neighbor, length) pairs.
+        """
+        mask = self.adjacency[cell] if self.adjacency is not None else self._mask(cell)
+        return [(cell + offset, length) for offset, length in self._mask_moves[mask]]
+
+    def copy_layout(self, other: "CompactGrid") -> None:
+        """
+        Make this grid a copy of the layout of another grid of the same size: its barriers, start, end, costs and moves.
+        The cells colored by a search on the other grid are copied as UNVISITED.
+        Structures derived from the layout are notified as if the whole grid was reset.
+        Args:
+            other (CompactGrid): The grid to copy.
+        Returns:
+            None
+        Raises:
+            ValueError: If the grids do not have the same size.
+        """
+        if (self.rows, self.cols) != (other.rows, other.cols):
+            raise ValueError(f"cannot copy a {other.rows}x{other.cols} grid into a {self.rows}x{self.cols} grid")
+        self.state[:] = bytes(other.state).translate(_LAYOUT_STATES)
+        self.cost[:] = other.cost
+        self._weighted_cells = other._weighted_cells
+        # also bumps the version, rebuilds the adjacency and notifies the listeners
+        self.set_connectivity(other.connectivity, other.corner_cutting)
+
+    def reset(self) -> None:
+        """
+        Reset every cell of the grid to UNVISITED, with the default cost.
+        Returns:
+            None
+        """
+        self.state[:] = bytes(len(self.state))
+        self.cost[:] = bytes([DEFAULT_COST]) * len(self.cost)
+        self._weighted_cells = 0
+        self.version += 1
+        if self.adjacency is not None:
+            self.build_adjacency()
+        for listener in self.barrier_listeners:
+            listener(None)
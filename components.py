@@ -0,0 +1,161 @@
+from array import array
+from collections import deque
+from compact_grid import BARRIER
+
+# Connected components of the walkable cells, to answer "can b be reached from a?" in O(1) before any search.
+# Every walkable cell holds a component label; labels merged since the last labelling are joined in a union-find.
+# Erasing a barrier only merges labels. Painting a barrier can split a component, but only if the cells around it
+# lose their connection: when the walkable cells of its 3x3 ring are still connected within the ring, every path
+# that went through the new barrier can go around it, and the labels stay valid. Otherwise the grid is labelled
+# again, lazily, on the next query.
+
+NO_COMPONENT = -1  # the label of barriers
+
+class ComponentIndex:
+    def __init__(self, grid):
+        """
+        The connected components of a grid, kept up to date as barriers are painted and erased.
+        Once created, it is attached to the grid as `grid.components`, and every search of the engine
+        returns "not found" at once, without expanding any cell, when the start and end are in different components.
+        Args:
+            grid (CompactGrid): The grid to index.
+        """
+        self.grid = grid
+        self.labels: array = array('l')
+        self.parent: list[int] = []  # union-find over the labels: every label points towards its representative
+        self.dirty: bool = True  # the labels must be computed again before the next query
+        grid.barrier_listeners.append(self._on_barrier_change)
+        grid.components = self
+
+    def close(self) -> None:
+        """
+        Stop listening to the barrier changes of the grid and detach the index from it.
+        Returns:
+            None
+        """
+        if self._on_barrier_change in self.grid.barrier_listeners:
+            self.grid.barrier_listeners.remove(self._on_barrier_change)
+        if self.grid.components is self:
+            self.grid.components = None
+
+    def relabel(self) -> None:
+        """
+        Label every walkable cell with its component, with one flood fill per component.
+        Returns:
+            None
+        """
+        grid = self.grid
+        neighbors = grid.neighbors
+        state = grid.state
+        labels = array('l', [NO_COMPONENT]) * (grid.rows * grid.cols)
+        parent = []
+        for cell in range(len(labels)):
+            if labels[cell] != NO_COMPONENT or state[cell] == BARRIER:
+                continue
+            label = len(parent)
+            parent.append(label)
+            labels[cell] = label
+            queue = deque([cell])
+            while queue:
+                for neighbor in neighbors(queue.popleft()):
+                    if labels[neighbor] == NO_COMPONENT:
+                        labels[neighbor] = label
+                        queue.append(neighbor)
+        self.labels = labels
+        self.parent = parent
+        self.dirty = False
+
+    def _find(self, label: int) -> int:
+        """
+        Get the representative of a label, compressing the path to it.
+        """
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        """
+        Merge the components of two labels.
+        """
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def component(self, cell: int) -> int:
+        """
+        Get the component of a cell.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            int: The representative label of its component, or NO_COMPONENT for a barrier.
+        """
+        if self.dirty:
+            self.relabel()
+        label = self.labels[cell]
+        return NO_COMPONENT if label == NO_COMPONENT else self._find(label)
+
+    def connected(self, a: int, b: int) -> bool:
+        """
+        Checks if a path can lead from one cell to another.
+        Args:
+            a (int): The first cell.
+            b (int): The second cell.
+        Returns:
+            bool: True if both cells are walkable and in the same component (or are the same cell).
+        """
+        if a == b:
+            return True
+        component = self.component(a)
+        return component != NO_COMPONENT and component == self.component(b)
+
+    def _on_barrier_change(self, cell: int | None) -> None:
+        if self.dirty:
+            return
+        if cell is None:  # the whole grid was reset, or its moves changed
+            self.dirty = True
+            return
+
+        is_barrier = self.grid.state[cell] == BARRIER
+        was_barrier = self.labels[cell] == NO_COMPONENT
+        if is_barrier == was_barrier:
+            return  # only the cost of the cell changed
+        if not is_barrier:
+            # an erased barrier joins the components of its neighbors
+            label = len(self.parent)
+            self.parent.append(label)
+            self.labels[cell] = label
+            for neighbor in self.grid.neighbors(cell):
+                self._union(label, self.labels[neighbor])
+        elif self._ring_connected(cell):
+            self.labels[cell] = NO_COMPONENT
+        else:
+            self.dirty = True
+
+    def _ring_connected(self, cell: int) -> bool:
+        """
+        Checks if the walkable cells next to a new barrier are still connected to each other
+        through the 3x3 ring around it, so that the barrier cannot split their component.
+        """
+        grid = self.grid
+        row, col = divmod(cell, grid.cols)
+        ring = {r * grid.cols + c
+                for r in range(max(row - 1, 0), min(row + 2, grid.rows))
+                for c in range(max(col - 1, 0), min(col + 2, grid.cols))
+                if (r, c) != (row, col) and grid.state[r * grid.cols + c] != BARRIER}
+        # the cells the barrier may have connected (on 8-connected grids, diagonal ones included)
+        required = [neighbor for neighbor in grid.around(cell) if neighbor in ring]
+        if len(required) <= 1:
+            return True
+
+        reached = {required[0]}
+        queue = deque(reached)
+        while queue:
+            for neighbor in grid.neighbors(queue.popleft()):
+                if neighbor in ring and neighbor not in reached:
+                    reached.add(neighbor)
+                    queue.append(neighbor)
+        return all(neighbor in reached for neighbor in required)
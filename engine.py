@@ -0,0 +1,710 @@
+from collections import deque
+from math import sqrt
+from open_list import OpenList
+from scratch import SearchScratch, score_tables
+
+_SQRT2 = sqrt(2)
+
+# The engine runs the search algorithms without any knowledge of pygame or of the window.
+# An algorithm only needs a grid object exposing:
+#   grid.neighbors(cell) -> iterable of the walkable cells next to `cell`
+#   grid.position(cell)  -> (row, col) of `cell`, used by the heuristics
+#   grid.moves(cell)     -> iterable of (neighbor, length) pairs: the length of a move is 1, or sqrt(2) diagonally
+#   grid.cost[cell]      -> the cost of moving into `cell` (at least 1), used by the weighted searches
+# UCS, Dijkstra, A*, bidirectional A* and IDA* add up the length of every move times the cost of the cell it enters.
+# BFS, DFS, DLS, IDS and bidirectional BFS count moves instead (their cost is the number of moves of the path).
+# CompactGrid (compact_grid.py) is the usual one: its cells are flat integer indices into a one-byte-per-cell state plane.
+# Visualization is optional: pass a SearchObserver to be notified while the search runs.
+# When a ComponentIndex (components.py) is attached to the grid as `grid.components`, every search first checks that
+# the start and end are in the same component, and returns "not found" at once, without expanding any cell, otherwise.
+# The informed searches (astar, ida, bidirectional_astar) take a `heuristic`: any callable estimating the cost
+# between two (row, col) positions without ever overestimating it (every move costs at least its length), such as
+# h_manhattan_distance (the default on 4-connected grids), h_octile_distance (the default on 8-connected grids),
+# h_euclidian_distance, or a LandmarkHeuristic (landmarks.py) precomputed for the grid.
+
+
+class SearchResult:
+    def __init__(self, found: bool, path: list, cost: float, expanded: int):
+        """
+        The outcome of a search.
+        Args:
+            found (bool): True if a path from start to end was found.
+            path (list): The cells of the path, from start to end (empty if not found).
+            cost (float): The cost of the path (float('inf') if not found).
+            expanded (int): The number of cells expanded by the search.
+        """
+        self.found: bool = found
+        self.path: list = path
+        self.cost: float = cost
+        self.expanded: int = expanded
+
+    def __bool__(self) -> bool:
+        """
+        A result is truthy when a path was found, so it can be used where a bool was expected.
+        """
+        return self.found
+
+    def __repr__(self) -> str:
+        return f"SearchResult(found={self.found}, cost={self.cost}, expanded={self.expanded}, path_length={len(self.path)})"
+
+
+class SearchObserver:
+    """
+    Receives the events of a running search. Every method is a no-op, so subclasses only override what they need.
+    """
+    def on_open(self, cell) -> None:
+        """
+        Called when a cell is added to the frontier.
+        """
+
+    def on_expand(self, cell) -> None:
+        """
+        Called after a cell has been expanded (all its neighbors were looked at).
+        """
+
+    def on_path(self, cell) -> None:
+        """
+        Called for every cell of the final path, walking back from the end to the start.
+        """
+
+    def on_finish(self, result: SearchResult) -> None:
+        """
+        Called once, when the search is over.
+        """
+
+
+def h_manhattan_distance(p1: tuple[int, int], p2: tuple[int, int]) -> float:
+    """
+    Heuristic function for A* algorithm: uses the Manhattan distance between two points.
+    Args:
+        p1 (tuple[int, int]): The first point (x1, y1).
+        p2 (tuple[int, int]): The second point (x2, y2).
+    Returns:
+        float: The Manhattan distance between p1 and p2.
+    """
+    return abs(p2[0] - p1[0]) + abs(p2[1] - p1[1])
+
+def h_euclidian_distance(p1: tuple[int, int], p2: tuple[int, int]) -> float:
+    """
+    Heuristic function for A* algorithm: uses the Euclidian distance between two points.
+    Args:
+        p1 (tuple[int, int]): The first point (x1, y1).
+        p2 (tuple[int, int]): The second point (x2, y2).
+    Returns:
+        float: The Euclidian distance between p1 and p2.
+    """
+    return sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
+
+def h_octile_distance(p1: tuple[int, int], p2: tuple[int, int]) -> float:
+    """
+    Heuristic function for A* algorithm on 8-connected grids: uses the octile distance between two points,
+    the length of the shortest path made of orthogonal and diagonal moves.
+    Args:
+        p1 (tuple[int, int]): The first point (x1, y1).
+        p2 (tuple[int, int]): The second point (x2, y2).
+    Returns:
+        float: The octile distance between p1 and p2.
+    """
+    dx, dy = abs(p2[0] - p1[0]), abs(p2[1] - p1[1])
+    return max(dx, dy) + (_SQRT2 - 1) * min(dx, dy)
+
+def default_heuristic(grid) -> callable:
+    """
+    Get the distance matching the moves of a grid: Manhattan on a 4-connected grid, octile on an 8-connected one.
+    Args:
+        grid: The grid to search (see the module notes).
+    Returns:
+        callable: The heuristic function.
+    """
+    return h_octile_distance if getattr(grid, 'connectivity', 4) == 8 else h_manhattan_distance
+
+
+def _finish(observer: SearchObserver | None, came_from: dict, end, cost: float, expanded: int) -> SearchResult:
+    """
+    Build the result of a successful search by walking the came_from links back from the end.
+    Args:
+        observer (SearchObserver | None): Notified of every cell of the path.
+        came_from (dict): Maps each reached cell to the cell it was reached from.
+        end: The ending cell.
+        cost (float): The cost of the path.
+        expanded (int): The number of expanded cells.
+    Returns:
+        SearchResult: The result of the search.
+    """
+    path = [end]
+    current = end
+    while current in came_from:
+        current = came_from[current]
+        path.append(current)
+        if observer is not None:
+            observer.on_path(current)
+    path.reverse()
+
+    result = SearchResult(True, path, cost, expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+def _not_found(observer: SearchObserver | None, expanded: int) -> SearchResult:
+    """
+    Build the result of a search that did not reach the end.
+    Args:
+        observer (SearchObserver | None): Notified that the search is over.
+        expanded (int): The number of expanded cells.
+    Returns:
+        SearchResult: The result of the search.
+    """
+    result = SearchResult(False, [], float('inf'), expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+
+def _disconnected(grid, start, end) -> bool:
+    """
+    Checks if the component index of the grid, if it has one, proves that no path joins start and end.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+    Returns:
+        bool: True if start and end are in different components, False if they are connected or the grid has no index.
+    """
+    components = getattr(grid, 'components', None)
+    return components is not None and not components.connected(start, end)
+
+
+def bfs(grid, start, end, observer: SearchObserver | None = None, scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Breadth-First Search (BFS) Algorithm.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    neighbors = grid.neighbors
+    queue = deque([start])
+    g_score, came_from = score_tables(start, scratch)  # a cell is visited once it has a g_score
+    expanded = 0
+
+    while queue:
+        current = queue.popleft()
+
+        if current == end:
+            return _finish(observer, came_from, end, g_score[end], expanded)
+
+        expanded += 1
+        depth = g_score[current] + 1
+        for neighbor in neighbors(current):
+            if neighbor not in g_score:
+                g_score[neighbor] = depth
+                came_from[neighbor] = current
+                queue.append(neighbor)
+                if observer is not None:
+                    observer.on_open(neighbor)
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    return _not_found(observer, expanded)
+
+def dfs(grid, start, end, observer: SearchObserver | None = None, scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Depth-First Search (DFS) Algorithm.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    neighbors = grid.neighbors
+    stack = [start]
+    g_score, came_from = score_tables(start, scratch)  # a cell is visited once it has a g_score
+    expanded = 0
+
+    while stack:
+        current = stack.pop()
+
+        if current == end:
+            return _finish(observer, came_from, end, g_score[end], expanded)
+
+        expanded += 1
+        depth = g_score[current] + 1
+        for neighbor in neighbors(current):
+            if neighbor not in g_score:
+                g_score[neighbor] = depth
+                came_from[neighbor] = current
+                stack.append(neighbor)
+                if observer is not None:
+                    observer.on_open(neighbor)
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    return _not_found(observer, expanded)
+
+def astar(grid, start, end, observer: SearchObserver | None = None, queue_type: type = OpenList,
+          scratch: SearchScratch | None = None, heuristic: callable = None) -> SearchResult:
+    """
+    A* Pathfinding Algorithm.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        queue_type (type): The open list to use: OpenList, or BucketQueue for integer costs (4-connected grids).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+        heuristic (callable | None): Estimates the cost between two (row, col) positions; it must never overestimate it
+            (defaults to default_heuristic(grid)).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    heuristic = heuristic or default_heuristic(grid)
+    position = grid.position
+    end_position = position(end)
+
+    def estimate(cell) -> float:
+        return heuristic(position(cell), end_position)
+
+    return _best_first(grid, start, end, estimate, observer, queue_type, scratch)
+
+def _depth_first(grid, start, end, bound: float, estimate: callable, cost, observer: SearchObserver | None, best_g,
+                 table_limit: int | None) -> tuple:
+    """
+    One bounded depth-first pass, shared by DLS, IDS and IDA*. It runs on an explicit stack, so long corridors
+    do not hit Python's recursion limit. Cells on the current path are never revisited, and a transposition
+    table keeps the lowest cost every cell was reached at in this pass: a cell reached again at no lower cost
+    is not searched again, which keeps the pass from re-expanding the same cells exponentially.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        bound (float): Cells whose f-cost (cost so far, plus the estimate if any) exceeds it are cut off.
+        estimate (callable): Estimates the cost from a cell to the end, or None to bound the cost so far (the depth) only.
+        cost: The cost plane of the grid, or None to count moves.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        best_g: The transposition table (a dict or a StampedTable), empty apart from the start at cost 0.
+        table_limit (int | None): The maximum number of cells in the table (None: no limit). When it is full,
+            new cells are only checked against the current path.
+    Returns:
+        tuple: (found, value, path, expanded). `value` is the cost of the path if found, else the lowest f-cost
+        that was cut off (float('inf') if nothing was: a larger bound cannot reach more cells).
+    """
+    if start == end:
+        return True, 0, [start], 0
+
+    moves = grid.moves
+    path = [start]
+    g_scores = [0]  # the cost so far of every cell of the path
+    on_path = {start}
+    iterators = [iter(moves(start))]
+    stored = 1
+    next_bound = float('inf')
+    expanded = 1
+
+    while iterators:
+        neighbor, length = next(iterators[-1], (None, 0))
+        if neighbor is None:
+            # every neighbor of the cell was searched: backtrack
+            iterators.pop()
+            current = path.pop()
+            g_scores.pop()
+            on_path.discard(current)
+            if observer is not None:
+                observer.on_expand(current)
+            continue
+
+        if neighbor in on_path:
+            continue
+        g_score = g_scores[-1] + (cost[neighbor] * length if cost is not None else 1)
+        f_score = g_score + estimate(neighbor) if estimate else g_score
+        if f_score > bound:
+            if f_score < next_bound:
+                next_bound = f_score
+            continue
+        if g_score >= best_g.get(neighbor, float('inf')):
+            continue
+        if neighbor in best_g or table_limit is None or stored < table_limit:
+            if neighbor not in best_g:
+                stored += 1
+            best_g[neighbor] = g_score
+
+        if observer is not None:
+            observer.on_open(neighbor)
+        path.append(neighbor)
+        if neighbor == end:
+            return True, g_score, path, expanded
+
+        g_scores.append(g_score)
+        on_path.add(neighbor)
+        iterators.append(iter(moves(neighbor)))
+        expanded += 1
+
+    return False, next_bound, [], expanded
+
+def _path_found(observer: SearchObserver | None, path: list, cost: float, expanded: int) -> SearchResult:
+    """
+    Build the result of a depth-first search from the path it ended on.
+    """
+    return _finish(observer, dict(zip(path[1:], path)), path[-1], cost, expanded)
+
+def dls(grid, start, end, limit: int, observer: SearchObserver | None = None, scratch: SearchScratch | None = None,
+        table_limit: int | None = None) -> SearchResult:
+    """
+    Depth-Limited Search (DLS) Algorithm: a depth-first search that does not go deeper than `limit` moves.
+    It finds the end whenever it is at most `limit` moves away, although not always along the shortest path.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        limit (int): The depth limit for the search.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+        table_limit (int | None): The maximum number of cells in the transposition table (None: no limit).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    best_g, _ = score_tables(start, scratch)
+    found, cost, path, expanded = _depth_first(grid, start, end, limit, None, None, observer, best_g, table_limit)
+    if found:
+        return _path_found(observer, path, cost, expanded)
+    return _not_found(observer, expanded)
+
+def _best_first(grid, start, end, heuristic: callable, observer: SearchObserver | None, queue_type: type,
+                scratch: SearchScratch | None) -> SearchResult:
+    """
+    Best-first search ordered by g + h, shared by A* (with a heuristic) and UCS / Dijkstra (without one).
+    When a shorter path to a queued cell is found, the cell is re-queued with its better priority.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        heuristic (callable): Estimates the cost from a cell to the end, or None to order by the cost so far only.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        queue_type (type): The class of the open list (OpenList or BucketQueue).
+        scratch (SearchScratch | None): Reusable score storage, or None to allocate it lazily.
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    moves = grid.moves
+    cost = grid.cost
+
+    open_list = queue_type()
+    open_list.push(start, heuristic(start) if heuristic else 0)
+    g_score, came_from = score_tables(start, scratch)
+    expanded = 0
+
+    while open_list:
+        current, _ = open_list.pop()
+
+        if current == end:
+            return _finish(observer, came_from, end, g_score[end], expanded)
+
+        expanded += 1
+        current_g_score = g_score[current]
+        for neighbor, length in moves(current):
+            tentative_g_score = current_g_score + cost[neighbor] * length
+            if tentative_g_score < g_score.get(neighbor, float('inf')):
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                open_list.push(neighbor, tentative_g_score + heuristic(neighbor) if heuristic else tentative_g_score)
+                if observer is not None:
+                    observer.on_open(neighbor)
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    return _not_found(observer, expanded)
+
+def ucs(grid, start, end, observer: SearchObserver | None = None, queue_type: type = OpenList,
+        scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Uniform Cost Search (UCS) Algorithm.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        queue_type (type): The open list to use: OpenList, or BucketQueue for integer costs (4-connected grids).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    return _best_first(grid, start, end, None, observer, queue_type, scratch)
+
+def dijkstra(grid, start, end, observer: SearchObserver | None = None, queue_type: type = OpenList,
+             scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Dijkstra's Algorithm.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        queue_type (type): The open list to use: OpenList, or BucketQueue for integer costs (4-connected grids).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    return _best_first(grid, start, end, None, observer, queue_type, scratch)
+
+def ids(grid, start, end, max_depth: int, observer: SearchObserver | None = None, scratch: SearchScratch | None = None,
+        table_limit: int | None = None) -> SearchResult:
+    """
+    Iterative Deepening Search (IDS) Algorithm: depth-limited searches with a growing limit, so the first
+    path found is a shortest one. It stops early once a limit cuts nothing off, as the whole reachable part
+    of the grid was then searched.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        max_depth (int): The maximum depth to search.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+        table_limit (int | None): The maximum number of cells in the transposition table (None: no limit).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells (summed over all the iterations).
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    expanded = 0
+    depth = 0
+    while depth < max_depth:
+        best_g, _ = score_tables(start, scratch)
+        found, value, path, iteration_expanded = _depth_first(grid, start, end, depth, None, None, observer, best_g, table_limit)
+        expanded += iteration_expanded
+        if found:
+            return _path_found(observer, path, value, expanded)
+        if value == float('inf'):
+            break
+        depth = value
+    return _not_found(observer, expanded)
+
+def ida(grid, start, end, initial_threshold: float | None = None, observer: SearchObserver | None = None,
+        heuristic: callable = None, scratch: SearchScratch | None = None,
+        table_limit: int | None = None) -> SearchResult:
+    """
+    Iterative Deepening A* (IDA*) Algorithm: depth-first searches bounded by the f-cost, the bound growing
+    to the lowest f-cost cut off by the previous iteration.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        initial_threshold (float | None): The initial threshold for the f-cost (defaults to the heuristic of the start).
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        heuristic (callable | None): Estimates the cost between two (row, col) positions; it must never overestimate it
+            (defaults to default_heuristic(grid)).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+        table_limit (int | None): The maximum number of cells in the transposition table (None: no limit).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells (summed over all the iterations).
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    heuristic = heuristic or default_heuristic(grid)
+    position = grid.position
+    end_position = position(end)
+
+    def estimate(cell) -> float:
+        return heuristic(position(cell), end_position)
+
+    if initial_threshold is None:
+        initial_threshold = estimate(start)
+
+    threshold = initial_threshold
+    expanded = 0
+    while True:
+        best_g, _ = score_tables(start, scratch)
+        found, value, path, iteration_expanded = _depth_first(grid, start, end, threshold, estimate, grid.cost, observer,
+                                                              best_g, table_limit)
+        expanded += iteration_expanded
+        if found:
+            return _path_found(observer, path, value, expanded)
+        if value == float('inf'):
+            return _not_found(observer, expanded)
+        threshold = value
+
+def _finish_bidirectional(observer: SearchObserver | None, forward: dict, backward: dict, meet, cost: float,
+                          expanded: int) -> SearchResult:
+    """
+    Build the result of a bidirectional search by joining the two halves of the path where they meet.
+    Args:
+        observer (SearchObserver | None): Notified of every cell of the path.
+        forward (dict): The came_from links of the search from the start.
+        backward (dict): The came_from links of the search from the end (pointing towards the end).
+        meet: The cell where the two searches met.
+        cost (float): The cost of the path.
+        expanded (int): The number of cells expanded by both searches.
+    Returns:
+        SearchResult: The result of the search.
+    """
+    path = [meet]
+    current = meet
+    while current in forward:
+        current = forward[current]
+        path.append(current)
+    path.reverse()
+    current = meet
+    while current in backward:
+        current = backward[current]
+        path.append(current)
+
+    if observer is not None:
+        for cell in reversed(path[:-1]):
+            observer.on_path(cell)
+    result = SearchResult(True, path, cost, expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+def bidirectional_bfs(grid, start, end, observer: SearchObserver | None = None,
+                      scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Bidirectional Breadth-First Search: grows one BFS from the start and one from the end, one whole layer
+    at a time (always the smaller frontier), and stops at the end of the layer where they meet.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py), used by the search from the start.
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    neighbors = grid.neighbors
+    forward_depth, forward_came_from = score_tables(start, scratch)
+    backward_depth, backward_came_from = {end: 0}, {}
+    if start == end:
+        return _finish_bidirectional(observer, forward_came_from, backward_came_from, start, 0, 0)
+
+    forward_frontier = [start]
+    backward_frontier = [end]
+    expanded = 0
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, depth, came_from, other_depth = forward_frontier, forward_depth, forward_came_from, backward_depth
+        else:
+            frontier, depth, came_from, other_depth = backward_frontier, backward_depth, backward_came_from, forward_depth
+
+        best_cost = float('inf')
+        best_link = None  # the edge (cell, neighbor) joining the two searches with the lowest cost
+        next_frontier = []
+        for current in frontier:
+            expanded += 1
+            next_depth = depth[current] + 1
+            for neighbor in neighbors(current):
+                if neighbor in other_depth and next_depth + other_depth[neighbor] < best_cost:
+                    best_cost = next_depth + other_depth[neighbor]
+                    best_link = (current, neighbor)
+                if neighbor not in depth:
+                    depth[neighbor] = next_depth
+                    came_from[neighbor] = current
+                    next_frontier.append(neighbor)
+                    if observer is not None:
+                        observer.on_open(neighbor)
+
+            if observer is not None:
+                observer.on_expand(current)
+
+        if best_link is not None:
+            current, neighbor = best_link
+            # link the neighbor to the cell of this layer, so both halves meet in `neighbor`
+            came_from[neighbor] = current
+            return _finish_bidirectional(observer, forward_came_from, backward_came_from, neighbor, best_cost, expanded)
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return _not_found(observer, expanded)
+
+def bidirectional_astar(grid, start, end, observer: SearchObserver | None = None,
+                        scratch: SearchScratch | None = None, heuristic: callable = None) -> SearchResult:
+    """
+    Bidirectional A*: one A* from the start towards the end and one from the end towards the start,
+    always expanding the side with the smaller open list. Every time a cell reached by one side is reached
+    by the other, the path through it is a candidate. The search stops once the lowest f-score of either
+    open list is no lower than the best candidate: the heuristic is admissible, so no cheaper path can remain.
+    Args:
+        grid: The grid to search (see the module notes).
+        start: The starting cell.
+        end: The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py), used by the search from the start.
+        heuristic (callable | None): Estimates the cost between two (row, col) positions; it must never overestimate it
+            (defaults to default_heuristic(grid)).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    heuristic = heuristic or default_heuristic(grid)
+    moves = grid.moves
+    cost = grid.cost
+    position = grid.position
+    start_position, end_position = position(start), position(end)
+
+    forward_g_score, forward_came_from = score_tables(start, scratch)
+    backward_g_score, backward_came_from = {end: 0}, {}
+    forward_open, backward_open = OpenList(), OpenList()
+    forward_open.push(start, heuristic(start_position, end_position))
+    backward_open.push(end, heuristic(end_position, start_position))
+
+    best_cost = 0 if start == end else float('inf')
+    meet = start if start == end else None
+    expanded = 0
+
+    while forward_open and backward_open:
+        _, forward_top = forward_open.peek()
+        _, backward_top = backward_open.peek()
+        if forward_top >= best_cost or backward_top >= best_cost:
+            break
+
+        if len(forward_open) <= len(backward_open):
+            open_list, g_score, came_from, other_g_score, target = (
+                forward_open, forward_g_score, forward_came_from, backward_g_score, end_position)
+        else:
+            open_list, g_score, came_from, other_g_score, target = (
+                backward_open, backward_g_score, backward_came_from, forward_g_score, start_position)
+
+        current, _ = open_list.pop()
+        expanded += 1
+        current_g_score = g_score[current]
+        for neighbor, length in moves(current):
+            # a move costs the cost of the cell it enters: the backward search walks the moves the other way
+            tentative_g_score = current_g_score + (cost[neighbor] if open_list is forward_open else cost[current]) * length
+            if tentative_g_score < g_score.get(neighbor, float('inf')):
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                open_list.push(neighbor, tentative_g_score + heuristic(position(neighbor), target))
+                if observer is not None:
+                    observer.on_open(neighbor)
+                if neighbor in other_g_score and tentative_g_score + other_g_score[neighbor] < best_cost:
+                    best_cost = tentative_g_score + other_g_score[neighbor]
+                    meet = neighbor
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    if meet is None:
+        return _not_found(observer, expanded)
+    return _finish_bidirectional(observer, forward_came_from, backward_came_from, meet, best_cost, expanded)
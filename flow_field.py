@@ -0,0 +1,139 @@
+from array import array
+from collections import deque
+from engine import SearchResult
+from open_list import OpenList
+try:
+    from wavefront import wavefront_distances
+except ImportError:  # NumPy is optional: distance_field then runs its own breadth-first pass
+    wavefront_distances = None
+
+# Marks the cells that cannot reach the source in a distance field.
+UNREACHABLE = -1
+
+def distance_field(grid, source: int) -> array:
+    """
+    Compute the distance from `source` to every cell of the grid in a single breadth-first pass.
+    Moves are undirected, so this is also the distance from every cell to `source`.
+    Args:
+        grid (CompactGrid): The grid to search.
+        source (int): The cell the distances are measured from.
+    Returns:
+        array: The distance of every cell, indexed by cell (UNREACHABLE for barriers and cut-off cells).
+    """
+    if wavefront_distances is not None:
+        # expand whole layers at once with NumPy (see wavefront.py)
+        distance = array('l')
+        distance.frombytes(wavefront_distances(grid, source).astype('l').tobytes())
+        return distance
+
+    neighbors = grid.neighbors
+    distance = array('l', [UNREACHABLE]) * (grid.rows * grid.cols)
+    distance[source] = 0
+    queue = deque([source])
+
+    while queue:
+        current = queue.popleft()
+        depth = distance[current] + 1
+        for neighbor in neighbors(current):
+            if distance[neighbor] == UNREACHABLE:
+                distance[neighbor] = depth
+                queue.append(neighbor)
+
+    return distance
+
+def cost_field(grid, target: int) -> array:
+    """
+    Compute the cost of the cheapest path from every cell of the grid to `target`, in a single Dijkstra sweep
+    from the target. A move costs its length times the cost of the cell it enters, so a sweep step from a cell
+    to its neighbor costs the move of an agent from that neighbor into the cell.
+    Args:
+        grid (CompactGrid): The grid to search.
+        target (int): The cell every path leads to.
+    Returns:
+        array: The cost of every cell, indexed by cell (UNREACHABLE for barriers and cut-off cells).
+    """
+    moves = grid.moves
+    cost = grid.cost
+    distance = array('d', [UNREACHABLE]) * (grid.rows * grid.cols)
+    distance[target] = 0
+    open_list = OpenList()
+    open_list.push(target, 0)
+
+    while open_list:
+        current, current_distance = open_list.pop()
+        step_cost = cost[current]
+        for neighbor, length in moves(current):
+            tentative = current_distance + step_cost * length
+            if distance[neighbor] == UNREACHABLE or tentative < distance[neighbor]:
+                distance[neighbor] = tentative
+                open_list.push(neighbor, tentative)
+
+    return distance
+
+class FlowField:
+    def __init__(self, grid, target: int):
+        """
+        The distances from every cell of the grid to one shared target, computed once: move counts on a
+        4-connected grid where every move costs the same, path costs (see cost_field) otherwise.
+        Any number of agents can then follow the field downhill to the target: each next step or
+        full path is read from the field in O(path length), with no further search.
+        The field describes the grid as it was when it was built; rebuild it after barriers change.
+        Args:
+            grid (CompactGrid): The grid to search.
+            target (int): The cell every agent wants to reach.
+        """
+        self.grid = grid
+        self.target: int = target
+        # on a uniform 4-connected grid the fewest moves are also the cheapest path
+        self.weighted: bool = not grid.is_uniform() or grid.connectivity != 4
+        self.distance: array = cost_field(grid, target) if self.weighted else distance_field(grid, target)
+
+    def reachable(self, cell: int) -> bool:
+        """
+        Checks if the target can be reached from a cell.
+        Args:
+            cell (int): The cell of the agent.
+        Returns:
+            bool: True if there is a path from the cell to the target.
+        """
+        return self.distance[cell] != UNREACHABLE
+
+    def next_step(self, cell: int) -> int | None:
+        """
+        Get the next cell on a shortest path from `cell` to the target.
+        Args:
+            cell (int): The cell of the agent.
+        Returns:
+            int | None: The neighbor to move to, or None if the agent is on the target or cannot reach it.
+        """
+        distance = self.distance
+        here = distance[cell]
+        if here == UNREACHABLE or here == 0:
+            return None
+        if self.weighted:
+            # the neighbor the cheapest path goes through; every move costs more than 0, so it is closer to the target
+            cost = self.grid.cost
+            return min(((neighbor, length) for neighbor, length in self.grid.moves(cell)
+                        if distance[neighbor] != UNREACHABLE),
+                       key=lambda move: distance[move[0]] + cost[move[0]] * move[1])[0]
+        for neighbor in self.grid.neighbors(cell):
+            if distance[neighbor] == here - 1:
+                return neighbor
+        return None
+
+    def path(self, cell: int) -> SearchResult:
+        """
+        Follow the field from `cell` down to the target.
+        Args:
+            cell (int): The cell of the agent.
+        Returns:
+            SearchResult: The path from the cell to the target (no cell is expanded).
+        """
+        if not self.reachable(cell):
+            return SearchResult(False, [], float('inf'), 0)
+
+        path = [cell]
+        while cell != self.target:
+            cell = self.next_step(cell)
+            path.append(cell)
+        return SearchResult(True, path, self.distance[path[0]], 0)
@@ -1,54 +1,199 @@
 from utils import *
-from spot import Spot
+from compact_grid import CompactGrid, UNVISITED
+from spot import Spot, STATE_COLORS, TERRAIN_COLORS
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: full repaints then draw the spots one by one
+    np = None
 
-class Grid:
-    def __init__(self, win: pygame.Surface, rows: int, cols: int, width: int, height: int):
+# Rendering only repaints what changed: every state or cost change records its cell as dirty, and draw_changes()
+# repaints those cells and returns their rectangles for pygame.display.update. The grid lines are drawn once on a
+# transparent surface and blitted back over every repainted cell.
+# A full repaint maps the whole state plane through a color table into one pixel per cell with NumPy, and scales that
+# image to the window in a single blit.
+
+# the RGB color of every state (indices 0 to 255) and of every cost of an unvisited cell (indices 256 to 511)
+_COLOR_TABLE = None if np is None else np.array(
+    [((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+     for color in STATE_COLORS + (0,) * (256 - len(STATE_COLORS)) + TERRAIN_COLORS],
+    dtype=np.uint8)
+
+class Grid(CompactGrid):
+    def __init__(self, win: pygame.Surface, rows: int, cols: int, width: int, height: int, connectivity: int = 4,
+                 corner_cutting: bool = False):
         """
         Initialize a grid with the given number of rows and columns, of the width and height of the window.
+        The cells are stored in the compact state plane of CompactGrid; Spot objects are only created as views for the GUI.
         Args:
-            win (pygame.Surface): The Pygame surface (window) where the grid will be drawn.
+            win (pygame.Surface): The Pygame surface (window) where the grid will be drawn (None for a headless grid).
             rows (int): Number of rows in the grid.
             cols (int): Number of columns in the grid.
             width (int): Width of the window in pixels.
             height (int): Height of the window in pixels.
+            connectivity (int): 4 to move orthogonally only, or 8 to also move diagonally.
+            corner_cutting (bool): On an 8-connected grid, allow diagonal moves past the corner of one barrier.
         """
+        super().__init__(rows, cols, connectivity, corner_cutting)
         self.win: pygame.Surface = win
-        self.rows: int = rows
-        self.cols: int = cols
         self.width: int = width
         self.height: int = height
-        self.grid: list[list[Spot]] = self._make_grid()
+        # the cells to repaint on the next draw_changes(), and whether the whole grid must be repainted instead
+        self.dirty: set[int] = set()
+        self.full_redraw: bool = True
+        self._lines: pygame.Surface | None = None  # the grid lines on a transparent surface, drawn on first use
 
-    def _make_grid(self) -> list[list[Spot]]:
+    # ---- Changes to repaint ----
+    def set_state(self, cell: int, state: int) -> None:
         """
-        Create a grid of Spot objects.
+        Set the state of a cell (see CompactGrid.set_state) and record it to be repainted.
+        Args:
+            cell (int): The index of the cell.
+            state (int): The new state of the cell.
         Returns:
-            list[list[Spot]]: A 2D list (matrix) representing the grid of Spot objects.
+            None
         """
-        grid = []
-        spot_width = self.width // self.rows  # width of each spot
-        spot_height = self.height // self.cols  # height of each spot
-        for i in range(self.rows):
-            grid.append([])
-            for j in range(self.cols):
-                spot = Spot(i, j, spot_width, spot_height, self.rows)
-                grid[i].append(spot)
-        return grid
+        super().set_state(cell, state)
+        self.dirty.add(cell)
+
+    def set_cost(self, cell: int, cost: int) -> None:
+        """
+        Set the cost of a cell (see CompactGrid.set_cost) and record it to be repainted.
+        Args:
+            cell (int): The index of the cell.
+            cost (int): The new cost.
+        Returns:
+            None
+        """
+        super().set_cost(cell, cost)
+        self.dirty.add(cell)
+
+    def reset(self) -> None:
+        """
+        Reset every cell (see CompactGrid.reset) and repaint the whole grid on the next draw_changes().
+        Returns:
+            None
+        """
+        super().reset()
+        self.full_redraw = True
+
+    def copy_layout(self, other: CompactGrid) -> None:
+        """
+        Copy the layout of another grid (see CompactGrid.copy_layout), repainted in full on the next draw_changes().
+        Args:
+            other (CompactGrid): The grid to copy.
+        Returns:
+            None
+        """
+        super().copy_layout(other)
+        self.full_redraw = True
+
+    def spot(self, row: int, col: int) -> Spot:
+        """
+        Get a view on the spot at (row, col).
+        Args:
+            row (int): The row of the spot.
+            col (int): The column of the spot.
+        Returns:
+            Spot: The spot at (row, col).
+        """
+        return Spot(self, row, col)
+
+    def spot_at(self, cell: int) -> Spot:
+        """
+        Get a view on the spot of a cell index.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            Spot: The spot of the cell.
+        """
+        return Spot(self, *self.position(cell))
 
-    def draw_grid_lines(self) -> None:
+    def spots(self):
+        """
+        Iterate over views on every spot of the grid, row by row.
+        Yields:
+            Spot: The spots of the grid.
+        """
+        for row in range(self.rows):
+            for col in range(self.cols):
+                yield Spot(self, row, col)
+
+    def draw_grid_lines(self, surface: pygame.Surface | None = None) -> None:
         """
         Draw the grid lines on the Pygame window.
+        Args:
+            surface (pygame.Surface | None): The surface to draw on instead of the window, if any.
         Returns:
             None
         """
+        surface = surface or self.win
         spot_width = self.width // self.rows  # gap between lines
         spot_height = self.height // self.cols  # gap between lines
         for i in range(self.rows):
             # draw horizontal lines
-            pygame.draw.line(self.win, COLORS2['GRID_LINES'], (0, i * spot_height), (self.width, i * spot_height))
+            pygame.draw.line(surface, COLORS2['GRID_LINES'], (0, i * spot_height), (self.width, i * spot_height))
         for j in range(self.cols):
             # draw vertical lines
-            pygame.draw.line(self.win, COLORS2['GRID_LINES'], (j * spot_width, 0), (j * spot_width, self.height))
+            pygame.draw.line(surface, COLORS2['GRID_LINES'], (j * spot_width, 0), (j * spot_width, self.height))
+
+    def grid_lines(self) -> pygame.Surface:
+        """
+        Get the grid lines drawn on a transparent surface of the size of the grid, drawing them on the first call.
+        Returns:
+            pygame.Surface: The cached surface.
+        """
+        if self._lines is None:
+            self._lines = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+            self.draw_grid_lines(self._lines)
+        return self._lines
+
+    def draw_changes(self) -> list[pygame.Rect]:
+        """
+        Repaint the cells whose state or cost changed since the last call, with the grid lines over them.
+        Returns:
+            list[pygame.Rect]: The repainted areas of the window, to give to pygame.display.update.
+        """
+        lines = self.grid_lines()
+        # past a few thousand cells, one repaint of the whole grid is cheaper than a rectangle per cell
+        if self.full_redraw or (np is not None and len(self.dirty) > 4096):
+            self.full_redraw = False
+            self.dirty.clear()
+            self.draw_cells()
+            self.win.blit(lines, (0, 0))
+            return [pygame.Rect(0, 0, self.width, self.height)]
+
+        rects = []
+        for cell in self.dirty:
+            spot = self.spot_at(cell)
+            rect = pygame.Rect(spot.x, spot.y, spot.width, spot.width)
+            spot.draw(self.win)
+            self.win.blit(lines, rect, rect)
+            rects.append(rect)
+        self.dirty.clear()
+        return rects
+
+    def draw_cells(self) -> None:
+        """
+        Paint every cell of the grid on the Pygame window, without the grid lines.
+        With NumPy, the state plane is turned into an image of one pixel per cell through a color table, and the image
+        is scaled to the window in one blit; without it, every spot is drawn on its own.
+        Returns:
+            None
+        """
+        self.win.fill(COLORS2['UNVISITED'], (0, 0, self.width, self.height))
+        if np is None:
+            for spot in self.spots():
+                spot.draw(self.win)
+            return
+
+        state = self.state_array()
+        cost = np.frombuffer(self.cost, dtype=np.uint8).reshape(self.rows, self.cols)
+        # unvisited cells are colored by their cost, the others by their state
+        colors = _COLOR_TABLE[np.where(state == UNVISITED, cost.astype(np.intp) + 256, state)]
+        # rows run along x and columns along y in the window, as in Spot, which is the layout surfarray expects
+        image = pygame.surfarray.make_surface(colors)
+        spot_width, spot_height = self.width // self.rows, self.height // self.cols
+        self.win.blit(pygame.transform.scale(image, (self.rows * spot_width, self.cols * spot_height)), (0, 0))
 
     def draw(self) -> None:
         """
@@ -56,13 +201,9 @@ class Grid:
         Returns:
             None
         """
-        self.win.fill(COLORS2['UNVISITED'])  # fill the window with white color
-
-        for row in self.grid:
-            for spot in row:
-                spot.draw(self.win)   # draw each spot
+        self.draw_cells()             # paint every spot, over a background fill of the grid area
 
-        self.draw_grid_lines()        # draw the grid lines          
+        self.draw_grid_lines()        # draw the grid lines
         pygame.display.update()       # update the display
 
     def get_clicked_pos(self, pos: tuple[int, int]) -> tuple[int, int]:
@@ -79,13 +220,3 @@ class Grid:
         col = x // spot_width
         row = y // spot_height
         return col, row
-    
-    def reset(self) -> None:
-        """
-        Reset the grid to its initial state.
-        Returns:
-            None
-        """
-        for row in self.grid:
-            for spot in row:
-                spot.reset()
\ No newline at end of file
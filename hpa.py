@@ -0,0 +1,337 @@
+from collections import deque
+from engine import SearchObserver, SearchResult, h_manhattan_distance, _disconnected, _not_found
+from open_list import OpenList
+from scratch import SearchScratch, score_tables
+
+# Hierarchical Path-Finding A* (HPA*).
+# The grid is cut into square clusters. Where two neighboring clusters touch through free cells, the border
+# gets one or two transitions (pairs of facing cells); the cells of the transitions are the abstract nodes.
+# Nodes of the same cluster are linked by their exact distance inside the cluster, and the two cells of a
+# transition by a move of cost 1. A query links the start and the end to the nodes of their clusters, searches
+# the small abstract graph, then refines every abstract edge into cells with a search bounded to one cluster.
+# Paths are near-optimal: they are optimal on the abstract graph, which only crosses borders at transitions.
+
+# borders whose run of free cells is at least this long get a transition at each end instead of one in the middle
+_WIDE_ENTRANCE = 6
+
+class HPAStar:
+    def __init__(self, grid, cluster_size: int = 16):
+        """
+        Build the cluster abstraction of a grid. The abstraction listens to the barrier changes of the grid
+        and only rebuilds the clusters they touched, the next time a path is requested.
+        Call close() when it is no longer needed.
+        Args:
+            grid (CompactGrid): The grid to search.
+            cluster_size (int): The width and height of a cluster, in cells.
+        """
+        self.grid = grid
+        self.cluster_size: int = cluster_size
+        self.cluster_rows: int = -(-grid.rows // cluster_size)
+        self.cluster_cols: int = -(-grid.cols // cluster_size)
+
+        # transitions of every border, keyed by the (lower, higher) pair of clusters it separates
+        self.transitions: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        # the nodes of every cluster, with their exact distances to the other nodes of the same cluster
+        self.intra: dict[int, dict[int, dict[int, int]]] = {}
+        # the transition partners of every node, in the neighboring clusters
+        self.inter: dict[int, set[int]] = {}
+
+        self._dirty: set[int] | None = None  # clusters touched by barrier changes (None: everything)
+        grid.barrier_listeners.append(self._on_barrier_change)
+
+    def close(self) -> None:
+        """
+        Stop listening to the barrier changes of the grid.
+        Returns:
+            None
+        """
+        if self._on_barrier_change in self.grid.barrier_listeners:
+            self.grid.barrier_listeners.remove(self._on_barrier_change)
+
+    def _on_barrier_change(self, cell: int | None) -> None:
+        if cell is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            self._dirty.add(self.cluster_of(cell))
+
+    # ---- Clusters ----
+    def cluster_of(self, cell: int) -> int:
+        """
+        Get the cluster a cell belongs to.
+        Args:
+            cell (int): The index of the cell.
+        Returns:
+            int: The index of the cluster (row-major, like cells).
+        """
+        row, col = divmod(cell, self.grid.cols)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    def _bounds(self, cluster: int) -> tuple[int, int, int, int]:
+        """
+        Get the first and last (excluded) rows and columns of a cluster.
+        """
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        size = self.cluster_size
+        return (cluster_row * size, min((cluster_row + 1) * size, self.grid.rows),
+                cluster_col * size, min((cluster_col + 1) * size, self.grid.cols))
+
+    def _adjacent_clusters(self, cluster: int) -> list[int]:
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        clusters = []
+        if cluster_row > 0:
+            clusters.append(cluster - self.cluster_cols)
+        if cluster_row < self.cluster_rows - 1:
+            clusters.append(cluster + self.cluster_cols)
+        if cluster_col > 0:
+            clusters.append(cluster - 1)
+        if cluster_col < self.cluster_cols - 1:
+            clusters.append(cluster + 1)
+        return clusters
+
+    def _local_distances(self, source: int, cluster: int, parents: dict | None = None) -> dict[int, int]:
+        """
+        Breadth-first search from a cell, without leaving its cluster.
+        Args:
+            source (int): The cell the search starts from.
+            cluster (int): The cluster the search is bounded to.
+            parents (dict | None): If given, filled with the parent of every reached cell.
+        Returns:
+            dict[int, int]: The distance of every reached cell of the cluster.
+        """
+        first_row, last_row, first_col, last_col = self._bounds(cluster)
+        cols = self.grid.cols
+        neighbors = self.grid.neighbors
+        distance = {source: 0}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            depth = distance[current] + 1
+            for neighbor in neighbors(current):
+                if neighbor not in distance:
+                    row, col = divmod(neighbor, cols)
+                    if first_row <= row < last_row and first_col <= col < last_col:
+                        distance[neighbor] = depth
+                        if parents is not None:
+                            parents[neighbor] = current
+                        queue.append(neighbor)
+        return distance
+
+    # ---- Building the abstraction ----
+    def _build_border(self, lower: int, higher: int) -> list[tuple[int, int]]:
+        """
+        Find the transitions of the border between two neighboring clusters.
+        Args:
+            lower (int): The cluster above, or on the left.
+            higher (int): The cluster below, or on the right.
+        Returns:
+            list[tuple[int, int]]: The transitions, as (cell of `lower`, cell of `higher`).
+        """
+        grid = self.grid
+        cols = grid.cols
+        first_row, last_row, first_col, last_col = self._bounds(lower)
+        if higher // self.cluster_cols == lower // self.cluster_cols:
+            # vertical border: pairs of cells side by side, along the last column of `lower`
+            pairs = [(row * cols + last_col - 1, row * cols + last_col) for row in range(first_row, last_row)]
+        else:
+            # horizontal border: pairs of cells one above the other, along the last row of `lower`
+            pairs = [((last_row - 1) * cols + col, last_row * cols + col) for col in range(first_col, last_col)]
+
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and not grid.is_barrier(pair[0]) and not grid.is_barrier(pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= _WIDE_ENTRANCE:
+                    transitions.extend((run[0], run[-1]))
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        return transitions
+
+    def _build_cluster(self, cluster: int) -> None:
+        """
+        Collect the nodes of a cluster from the transitions of its borders, and compute their distances.
+        """
+        nodes = set()
+        for other in self._adjacent_clusters(cluster):
+            key = (min(cluster, other), max(cluster, other))
+            for pair in self.transitions.get(key, ()):
+                nodes.add(pair[0] if key[0] == cluster else pair[1])
+
+        edges = {}
+        for node in nodes:
+            distance = self._local_distances(node, cluster)
+            edges[node] = {other: distance[other] for other in nodes if other != node and other in distance}
+        self.intra[cluster] = edges
+
+    def build(self) -> None:
+        """
+        Build the whole abstraction.
+        Returns:
+            None
+        """
+        self._rebuild(set(range(self.cluster_rows * self.cluster_cols)))
+        self._dirty = set()
+
+    def _rebuild(self, dirty: set[int]) -> None:
+        """
+        Rebuild the borders of the dirty clusters, then every cluster whose nodes may have changed.
+        """
+        for cluster in dirty:
+            for other in self._adjacent_clusters(cluster):
+                key = (min(cluster, other), max(cluster, other))
+                for a, b in self.transitions.get(key, ()):
+                    self.inter.get(a, set()).discard(b)
+                    self.inter.get(b, set()).discard(a)
+                self.transitions[key] = self._build_border(*key)
+                for a, b in self.transitions[key]:
+                    self.inter.setdefault(a, set()).add(b)
+                    self.inter.setdefault(b, set()).add(a)
+
+        touched = set(dirty)
+        for cluster in dirty:
+            touched.update(self._adjacent_clusters(cluster))
+        for cluster in touched:
+            self._build_cluster(cluster)
+
+    def ensure(self) -> None:
+        """
+        Bring the abstraction up to date with the barrier changes since the last query.
+        Returns:
+            None
+        """
+        if self._dirty is None:
+            self.transitions.clear()
+            self.intra.clear()
+            self.inter.clear()
+            self.build()
+        elif self._dirty:
+            self._rebuild(self._dirty)
+            self._dirty = set()
+
+    # ---- Queries ----
+    def search(self, start: int, end: int, observer: SearchObserver | None = None,
+               scratch: SearchScratch | None = None) -> SearchResult:
+        """
+        Find a path from start to end through the abstraction, then refine it into cells.
+        Args:
+            start (int): The starting cell.
+            end (int): The ending cell.
+            observer (SearchObserver | None): Optional observer notified while the search runs (only abstract nodes are opened and expanded).
+            scratch (SearchScratch | None): Optional reusable score storage for the abstract search (see scratch.py).
+        Returns:
+            SearchResult: The path, its cost and the number of expanded abstract nodes.
+        Raises:
+            ValueError: If the grid is 8-connected, or some of its cells cost more than others (the clusters
+                measure distances in orthogonal moves).
+        """
+        if not self.grid.is_uniform() or self.grid.connectivity != 4:
+            raise ValueError("HPA* needs a 4-connected grid where every move costs the same")
+        self.ensure()
+        grid = self.grid
+        if grid.is_barrier(start) or grid.is_barrier(end) or _disconnected(grid, start, end):
+            return _not_found(observer, 0)
+
+        start_cluster, end_cluster = self.cluster_of(start), self.cluster_of(end)
+        # temporary edges linking the start and the end to the nodes of their clusters
+        from_start = self._local_distances(start, start_cluster)
+        to_end = self._local_distances(end, end_cluster)
+        start_edges = {node: from_start[node] for node in self.intra[start_cluster] if node in from_start}
+        if end in from_start:
+            start_edges[end] = from_start[end]  # same cluster: the end can also be reached directly
+        end_edges = {node: to_end[node] for node in self.intra[end_cluster] if node in to_end}
+
+        position = grid.position
+        end_position = position(end)
+        open_list = OpenList()
+        open_list.push(start, h_manhattan_distance(position(start), end_position))
+        g_score, came_from = score_tables(start, scratch)
+        expanded = 0
+
+        while open_list:
+            current, _ = open_list.pop()
+            if current == end:
+                return self._refine(observer, came_from, start, end, g_score[end], expanded)
+
+            expanded += 1
+            edges = self._abstract_edges(current, start, start_edges, end, end_edges)
+            for node, cost in edges:
+                tentative_g_score = g_score[current] + cost
+                if tentative_g_score < g_score.get(node, float('inf')):
+                    came_from[node] = current
+                    g_score[node] = tentative_g_score
+                    open_list.push(node, tentative_g_score + h_manhattan_distance(position(node), end_position))
+                    if observer is not None:
+                        observer.on_open(node)
+
+            if observer is not None:
+                observer.on_expand(current)
+
+        return _not_found(observer, expanded)
+
+    def _abstract_edges(self, node: int, start: int, start_edges: dict, end: int, end_edges: dict) -> list[tuple[int, int]]:
+        """
+        Get the (neighbor, cost) edges of a node of the abstract graph, including the temporary ones of the query.
+        """
+        edges = []
+        if node == start:
+            edges.extend(start_edges.items())
+        cluster_edges = self.intra[self.cluster_of(node)].get(node)
+        if cluster_edges is not None:
+            edges.extend(cluster_edges.items())
+        for partner in self.inter.get(node, ()):
+            edges.append((partner, 1))
+        if node in end_edges:
+            edges.append((end, end_edges[node]))
+        return edges
+
+    def _refine(self, observer: SearchObserver | None, came_from: dict, start: int, end: int, cost: float,
+                expanded: int) -> SearchResult:
+        """
+        Turn the abstract path into cells: every abstract edge is either a transition (two adjacent cells)
+        or a shortest path inside one cluster.
+        """
+        abstract_path = [end]
+        while abstract_path[-1] != start:
+            abstract_path.append(came_from[abstract_path[-1]])
+        abstract_path.reverse()
+
+        path = [start]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)  # a transition between two clusters
+                continue
+            parents = {}
+            self._local_distances(a, self.cluster_of(a), parents)
+            segment = [b]
+            while segment[-1] != a:
+                segment.append(parents[segment[-1]])
+            path.extend(reversed(segment[:-1]))
+
+        if observer is not None:
+            for cell in reversed(path[:-1]):
+                observer.on_path(cell)
+        result = SearchResult(True, path, len(path) - 1, expanded)
+        if observer is not None:
+            observer.on_finish(result)
+        return result
+
+def hpa_star(grid, start: int, end: int, abstraction: HPAStar, observer: SearchObserver | None = None,
+             scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Hierarchical Path-Finding A* (HPA*) Algorithm, with the engine's calling convention (e.g. for batch.solve_batch).
+    Args:
+        grid (CompactGrid): The grid to search (the one the abstraction was built for).
+        start (int): The starting cell.
+        end (int): The ending cell.
+        abstraction (HPAStar): The cluster abstraction of the grid, kept between queries.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded abstract nodes.
+    Raises:
+        ValueError: If the grid is 8-connected, or some of its cells cost more than others.
+    """
+    return abstraction.search(start, end, observer, scratch)
@@ -0,0 +1,170 @@
+from engine import SearchObserver, SearchResult, default_heuristic, _disconnected, _not_found
+from open_list import OpenList
+
+INF = float('inf')
+# sums of diagonal moves (sqrt(2)) drift by a few ulps depending on the order they were added in,
+# so two keys closer than this are treated as equal
+EPSILON = 1e-9
+
+def _key_less(key: tuple[float, float], other: tuple[float, float]) -> bool:
+    if abs(key[0] - other[0]) > EPSILON:
+        return key[0] < other[0]
+    return key[1] < other[1] - EPSILON
+
+class LPAStar:
+    def __init__(self, grid, start: int, end: int):
+        """
+        Lifelong Planning A* (LPA*): an incremental A* between a fixed start and end.
+        The planner keeps its search state between runs. It listens to the barrier and cost changes of the grid,
+        and the next plan() only repairs the part of the shortest-path tree affected by them, instead of
+        searching the whole grid again. Call close() when the planner is no longer needed.
+        Args:
+            grid (CompactGrid): The grid to search.
+            start (int): The starting cell.
+            end (int): The ending cell.
+        """
+        self.grid = grid
+        self.start: int = start
+        self.end: int = end
+        self._end_position: tuple[int, int] = grid.position(end)
+        self._changed: set = set()  # cells whose barrier or cost changed since the last plan()
+        self._reset_search()
+        grid.barrier_listeners.append(self._on_barrier_change)
+
+    def close(self) -> None:
+        """
+        Stop listening to the barrier changes of the grid.
+        Returns:
+            None
+        """
+        if self._on_barrier_change in self.grid.barrier_listeners:
+            self.grid.barrier_listeners.remove(self._on_barrier_change)
+
+    def _reset_search(self) -> None:
+        """
+        Forget the search state, as if nothing had been planned yet.
+        """
+        # the distance matching the moves of the grid, which only change when the whole grid is reset
+        self._distance: callable = default_heuristic(self.grid)
+        # g is the cost of the last expansion of a cell, rhs the one-step lookahead cost computed
+        # from its neighbors; a cell is consistent when both are equal
+        self.g: dict = {}
+        self.rhs: dict = {self.start: 0}
+        self.open_list: OpenList = OpenList()
+        self.open_list.push(self.start, self._key(self.start))
+        self._changed.clear()
+
+    def _on_barrier_change(self, cell: int | None) -> None:
+        if cell is None:
+            self._changed = None  # the whole grid was reset
+        elif self._changed is not None:
+            self._changed.add(cell)
+
+    def _heuristic(self, cell: int) -> float:
+        return self._distance(self.grid.position(cell), self._end_position)
+
+    def _key(self, cell: int) -> tuple[float, float]:
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return best + self._heuristic(cell), best
+
+    def _update_cell(self, cell: int, observer: SearchObserver | None) -> None:
+        """
+        Recompute the lookahead cost of a cell and queue it if it became inconsistent.
+        """
+        barrier = self.grid.is_barrier(cell)
+        if barrier:
+            self.rhs[cell] = INF
+        elif cell == self.start:
+            self.rhs[cell] = 0
+        else:
+            g = self.g
+            # a move costs its length times the cost of the cell it enters
+            cost = self.grid.cost[cell]
+            self.rhs[cell] = min((g.get(neighbor, INF) + cost * length for neighbor, length in self.grid.moves(cell)), default=INF)
+
+        self.open_list.remove(cell)
+        if self.g.get(cell, INF) != self.rhs[cell]:
+            self.open_list.push(cell, self._key(cell))
+            if observer is not None and not barrier:
+                observer.on_open(cell)
+
+    def _apply_changes(self, observer: SearchObserver | None) -> None:
+        """
+        Repair the lookahead costs around the cells whose barrier or cost changed since the last plan().
+        """
+        if self._changed is None:
+            self._changed = set()
+            self._reset_search()
+            return
+
+        for cell in self._changed:
+            self._update_cell(cell, observer)
+            for neighbor in self.grid.around(cell):
+                self._update_cell(neighbor, observer)
+        self._changed.clear()
+
+    def plan(self, observer: SearchObserver | None = None) -> SearchResult:
+        """
+        Find the shortest path from the start to the end, reusing the work of the previous runs.
+        Args:
+            observer (SearchObserver | None): Optional observer notified while the search runs.
+        Returns:
+            SearchResult: The path and its cost; `expanded` only counts the cells expanded by this run.
+        """
+        if _disconnected(self.grid, self.start, self.end):
+            # the queued changes stay queued, and are repaired by the next run that can find a path
+            return _not_found(observer, 0)
+        self._apply_changes(observer)
+
+        g, rhs, open_list, end = self.g, self.rhs, self.open_list, self.end
+        neighbors = self.grid.neighbors
+        expanded = 0
+
+        while True:
+            top, top_key = open_list.peek()
+            if top is None:
+                break
+            if not _key_less(top_key, self._key(end)) and rhs.get(end, INF) == g.get(end, INF):
+                break
+
+            open_list.pop()
+            expanded += 1
+            if g.get(top, INF) > rhs.get(top, INF):
+                # overconsistent: the cell got cheaper, settle it and propagate to its neighbors
+                g[top] = rhs[top]
+                for neighbor in neighbors(top):
+                    self._update_cell(neighbor, observer)
+            else:
+                # underconsistent: the cell got more expensive, reopen it and its neighbors
+                g[top] = INF
+                self._update_cell(top, observer)
+                for neighbor in neighbors(top):
+                    self._update_cell(neighbor, observer)
+
+            if observer is not None and not self.grid.is_barrier(top):
+                observer.on_expand(top)
+
+        result = self._extract_path(expanded, observer)
+        if observer is not None:
+            observer.on_finish(result)
+        return result
+
+    def _extract_path(self, expanded: int, observer: SearchObserver | None) -> SearchResult:
+        """
+        Walk back from the end to the start, always to the neighbor with the lowest cost.
+        """
+        g = self.g
+        cost = g.get(self.end, INF)
+        if cost == INF:
+            return SearchResult(False, [], INF, expanded)
+
+        path = [self.end]
+        current = self.end
+        while current != self.start:
+            step_cost = self.grid.cost[current]
+            current = min(self.grid.moves(current), key=lambda move: g.get(move[0], INF) + step_cost * move[1])[0]
+            path.append(current)
+            if observer is not None:
+                observer.on_path(current)
+        path.reverse()
+        return SearchResult(True, path, cost, expanded)
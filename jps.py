@@ -0,0 +1,360 @@
+from array import array
+from engine import SearchObserver, SearchResult, h_manhattan_distance, _disconnected, _not_found
+from compact_grid import BARRIER
+from open_list import OpenList
+from scratch import SearchScratch, score_tables
+
+# Jump Point Search (JPS) on a 4-connected grid where every move costs 1.
+# Instead of opening every neighbor, the search "jumps" in a straight line until it reaches a jump point:
+# a cell where a path can usefully turn (it has a forced neighbor), or the end. Only jump points are
+# expanded, which prunes the many symmetric paths of open areas while keeping the paths optimal.
+# When moving horizontally, a cell is a jump point if the cell above (or below) it is free while the one
+# diagonally behind is a barrier. When moving vertically, the same test applies to the left and right,
+# and a cell is also a jump point if a horizontal jump from it finds one.
+
+def _jump_horizontal(grid, cell: int, step: int, end: int) -> int | None:
+    """
+    Jump from a cell in a horizontal direction.
+    Args:
+        grid (CompactGrid): The grid to search.
+        cell (int): The cell the jump starts from.
+        step (int): +1 to jump right, -1 to jump left.
+        end (int): The ending cell.
+    Returns:
+        int | None: The first jump point (or the end) in that direction, None if a wall comes first.
+    """
+    state = grid.state
+    cols = grid.cols
+    row, col = divmod(cell, cols)
+    has_up = row > 0
+    has_down = row < grid.rows - 1
+    while True:
+        col += step
+        if col < 0 or col >= cols:
+            return None
+        cell += step
+        if state[cell] == BARRIER:
+            return None
+        if cell == end:
+            return cell
+        if has_up and state[cell - cols] != BARRIER and state[cell - cols - step] == BARRIER:
+            return cell
+        if has_down and state[cell + cols] != BARRIER and state[cell + cols - step] == BARRIER:
+            return cell
+
+def _jump_vertical(grid, cell: int, step: int, end: int) -> int | None:
+    """
+    Jump from a cell in a vertical direction.
+    Args:
+        grid (CompactGrid): The grid to search.
+        cell (int): The cell the jump starts from.
+        step (int): +1 to jump down, -1 to jump up (in rows).
+        end (int): The ending cell.
+    Returns:
+        int | None: The first jump point (or the end) in that direction, None if a wall comes first.
+    """
+    state = grid.state
+    cols = grid.cols
+    row, col = divmod(cell, cols)
+    has_left = col > 0
+    has_right = col < cols - 1
+    offset = step * cols
+    while True:
+        row += step
+        if row < 0 or row >= grid.rows:
+            return None
+        cell += offset
+        if state[cell] == BARRIER:
+            return None
+        if cell == end:
+            return cell
+        if has_left and state[cell - 1] != BARRIER and state[cell - 1 - offset] == BARRIER:
+            return cell
+        if has_right and state[cell + 1] != BARRIER and state[cell + 1 - offset] == BARRIER:
+            return cell
+        if _jump_horizontal(grid, cell, 1, end) is not None or _jump_horizontal(grid, cell, -1, end) is not None:
+            return cell
+
+def _directions(grid, cell: int, parent: int | None) -> list[tuple[bool, int]]:
+    """
+    Get the directions to jump in from a cell, pruned by the direction it was reached from.
+    Returns:
+        list[tuple[bool, int]]: The directions, as (vertical, step) with a step of +1 or -1.
+    """
+    if parent is None:
+        return [(False, 1), (False, -1), (True, 1), (True, -1)]
+    forward = 1 if cell > parent else -1
+    if parent // grid.cols == cell // grid.cols:
+        return [(False, forward), (True, 1), (True, -1)]
+    return [(True, forward), (False, 1), (False, -1)]
+
+def _jps_successors(grid, cell: int, parent: int | None, end: int) -> list[int]:
+    """
+    Find the jump points reachable from a cell, by scanning the grid.
+    """
+    successors = []
+    for vertical, step in _directions(grid, cell, parent):
+        if vertical:
+            jump_point = _jump_vertical(grid, cell, step, end)
+        else:
+            jump_point = _jump_horizontal(grid, cell, step, end)
+        if jump_point is not None:
+            successors.append(jump_point)
+    return successors
+
+def _search(grid, start: int, end: int, successors: callable, observer: SearchObserver | None,
+            scratch: SearchScratch | None) -> SearchResult:
+    """
+    A* over jump points, shared by JPS and JPS+.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        successors (callable): Gives the jump points reachable from (cell, parent).
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Reusable score storage, or None to allocate it lazily.
+    Returns:
+        SearchResult: The full path (every cell, not only the jump points), its cost and the number of expanded jump points.
+    Raises:
+        ValueError: If the grid is 8-connected, or some of its cells cost more than others (jumps assume every move costs 1).
+    """
+    if not grid.is_uniform() or grid.connectivity != 4:
+        raise ValueError("Jump Point Search needs a 4-connected grid where every move costs the same")
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    position = grid.position
+    end_position = position(end)
+
+    open_list = OpenList()
+    open_list.push(start, h_manhattan_distance(position(start), end_position))
+    g_score, came_from = score_tables(start, scratch)
+    expanded = 0
+
+    while open_list:
+        current, _ = open_list.pop()
+
+        if current == end:
+            return _finish(grid, observer, came_from, start, end, expanded)
+
+        expanded += 1
+        current_position = position(current)
+        for jump_point in successors(current, came_from.get(current)):
+            jump_position = position(jump_point)
+            # jump points lie in a straight line from the current cell, so the distance is the cost
+            tentative_g_score = g_score[current] + h_manhattan_distance(current_position, jump_position)
+            if tentative_g_score < g_score.get(jump_point, float('inf')):
+                came_from[jump_point] = current
+                g_score[jump_point] = tentative_g_score
+                open_list.push(jump_point, tentative_g_score + h_manhattan_distance(jump_position, end_position))
+                if observer is not None:
+                    observer.on_open(jump_point)
+
+        if observer is not None:
+            observer.on_expand(current)
+
+    result = SearchResult(False, [], float('inf'), expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+def _finish(grid, observer: SearchObserver | None, came_from: dict, start: int, end: int, expanded: int) -> SearchResult:
+    """
+    Build the full path from the jump points, filling in the straight segments between them.
+    """
+    cols = grid.cols
+    path = [end]
+    current = end
+    while current != start:
+        jump_point = came_from[current]
+        step = (1 if jump_point > current else -1) * (1 if jump_point // cols == current // cols else cols)
+        while current != jump_point:
+            current += step
+            path.append(current)
+            if observer is not None:
+                observer.on_path(current)
+    path.reverse()
+
+    result = SearchResult(True, path, len(path) - 1, expanded)
+    if observer is not None:
+        observer.on_finish(result)
+    return result
+
+def jps(grid, start: int, end: int, observer: SearchObserver | None = None, scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Jump Point Search (JPS) Algorithm, for 4-connected grids where every move costs 1.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs (only jump points are opened and expanded).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded jump points.
+    Raises:
+        ValueError: If the grid is 8-connected, or some of its cells cost more than others.
+    """
+    def successors(cell: int, parent: int | None) -> list[int]:
+        return _jps_successors(grid, cell, parent, end)
+
+    return _search(grid, start, end, successors, observer, scratch)
+
+
+class JumpTable:
+    def __init__(self, grid):
+        """
+        The precomputed jumps of JPS+: for every cell and each of the 4 directions, the distance to the
+        first jump point in that direction (positive), or minus the number of free cells before a wall
+        (zero or negative). JPS+ then reads a jump in O(1) instead of scanning the grid.
+        The table listens to the barrier changes of the grid and is rebuilt the next time it is used.
+        Args:
+            grid (CompactGrid): The grid the jumps are computed for.
+        """
+        self.grid = grid
+        self.right: array | None = None
+        self.left: array | None = None
+        self.down: array | None = None
+        self.up: array | None = None
+        self.valid: bool = False
+        grid.barrier_listeners.append(self._on_barrier_change)
+
+    def close(self) -> None:
+        """
+        Stop listening to the barrier changes of the grid.
+        Returns:
+            None
+        """
+        if self._on_barrier_change in self.grid.barrier_listeners:
+            self.grid.barrier_listeners.remove(self._on_barrier_change)
+
+    def _on_barrier_change(self, cell: int | None) -> None:
+        self.valid = False
+
+    def ensure(self) -> None:
+        """
+        Rebuild the table if the grid changed since it was built.
+        Returns:
+            None
+        """
+        if not self.valid:
+            self.build()
+
+    def build(self) -> None:
+        """
+        Compute the jump distances of every cell, in O(rows * cols).
+        Returns:
+            None
+        """
+        grid = self.grid
+        state = grid.state
+        rows, cols = grid.rows, grid.cols
+        size = rows * cols
+        self.right = array('l', [0]) * size
+        self.left = array('l', [0]) * size
+        self.down = array('l', [0]) * size
+        self.up = array('l', [0]) * size
+
+        def free(cell: int) -> bool:
+            return state[cell] != BARRIER
+
+        # horizontal jumps, row by row
+        for row in range(rows):
+            first = row * cols
+            for table, step, cols_in_order in ((self.right, 1, range(cols - 1, -1, -1)), (self.left, -1, range(cols))):
+                for col in cols_in_order:
+                    cell = first + col
+                    nxt_col = col + step
+                    if nxt_col < 0 or nxt_col >= cols or not free(cell + step):
+                        table[cell] = 0
+                        continue
+                    nxt = cell + step
+                    # is the next cell a jump point when arriving from this cell?
+                    forced = ((row > 0 and free(nxt - cols) and not free(cell - cols))
+                              or (row < rows - 1 and free(nxt + cols) and not free(cell + cols)))
+                    if forced:
+                        table[cell] = 1
+                    else:
+                        following = table[nxt]
+                        table[cell] = following + 1 if following > 0 else following - 1
+
+        # vertical jumps, column by column; they also stop where a horizontal jump finds a jump point
+        right, left = self.right, self.left
+        for col in range(cols):
+            for table, step, rows_in_order in ((self.down, 1, range(rows - 1, -1, -1)), (self.up, -1, range(rows))):
+                offset = step * cols
+                for row in rows_in_order:
+                    cell = row * cols + col
+                    nxt_row = row + step
+                    if nxt_row < 0 or nxt_row >= rows or not free(cell + offset):
+                        table[cell] = 0
+                        continue
+                    nxt = cell + offset
+                    forced = ((col > 0 and free(nxt - 1) and not free(cell - 1))
+                              or (col < cols - 1 and free(nxt + 1) and not free(cell + 1))
+                              or right[nxt] > 0 or left[nxt] > 0)
+                    if forced:
+                        table[cell] = 1
+                    else:
+                        following = table[nxt]
+                        table[cell] = following + 1 if following > 0 else following - 1
+
+        self.valid = True
+
+    def successors(self, cell: int, parent: int | None, end: int) -> list[int]:
+        """
+        Find the jump points reachable from a cell, reading the precomputed distances.
+        The end is found when it lies within a jump; when moving vertically past the row of the end,
+        the search also stops on that row, so a horizontal jump can reach the end from there.
+        Args:
+            cell (int): The cell being expanded.
+            parent (int | None): The jump point it was reached from.
+            end (int): The ending cell.
+        Returns:
+            list[int]: The reachable jump points.
+        """
+        grid = self.grid
+        cols = grid.cols
+        row, col = divmod(cell, cols)
+        end_row, end_col = divmod(end, cols)
+        successors = []
+        for vertical, step in _directions(grid, cell, parent):
+            if not vertical:
+                distance = (self.right if step == 1 else self.left)[cell]
+                reach = distance if distance > 0 else -distance
+                if end_row == row and 0 < (end_col - col) * step <= reach:
+                    successors.append(end)
+                elif distance > 0:
+                    successors.append(cell + distance * step)
+            else:
+                distance = (self.down if step == 1 else self.up)[cell]
+                reach = distance if distance > 0 else -distance
+                if 0 < (end_row - row) * step <= reach:
+                    successors.append(cell + (end_row - row) * cols)
+                elif distance > 0:
+                    successors.append(cell + distance * step * cols)
+        return successors
+
+def jps_plus(grid, start: int, end: int, table: JumpTable | None = None, observer: SearchObserver | None = None,
+             scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    JPS+ Algorithm: Jump Point Search reading its jumps from a precomputed JumpTable.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        table (JumpTable | None): The jump table of the grid, kept between queries (built for this query if None).
+        observer (SearchObserver | None): Optional observer notified while the search runs (only jump points are opened and expanded).
+        scratch (SearchScratch | None): Optional reusable score storage (see scratch.py).
+    Returns:
+        SearchResult: The path, its cost and the number of expanded jump points.
+    Raises:
+        ValueError: If the grid is 8-connected, or some of its cells cost more than others.
+    """
+    if table is None:
+        table = JumpTable(grid)
+        table.close()  # only used for this query
+    table.ensure()
+
+    def successors(cell: int, parent: int | None) -> list[int]:
+        return table.successors(cell, parent, end)
+
+    return _search(grid, start, end, successors, observer, scratch)
@@ -0,0 +1,199 @@
+import struct
+import zlib
+from array import array
+from compact_grid import BARRIER
+from engine import default_heuristic
+from flow_field import distance_field, UNREACHABLE
+
+# ALT heuristic (A*, Landmarks, Triangle inequality).
+# The exact distance from a few landmark cells to every cell is computed once. For any landmark L, the triangle
+# inequality gives |d(L, a) - d(L, b)| <= d(a, b), so the largest of these differences is a lower bound of the
+# distance between a and b that, unlike the Manhattan distance, knows about the walls around them.
+
+# header of a saved table file: magic, rows, cols, number of landmarks, barrier fingerprint, connectivity,
+# corner cutting, table typecode
+_HEADER = struct.Struct('<4sIIIIB?c')
+_MAGIC = b'ALT2'
+
+# the value marking the cells a landmark cannot reach, for each table typecode
+_UNREACHABLE = {'H': 0xFFFF, 'I': 0xFFFFFFFF}
+
+# maps every cell state to 1 for barriers and 0 otherwise, to fingerprint the layout of the barriers
+_BARRIER_BYTES = bytes(1 if state == BARRIER else 0 for state in range(256))
+
+def barrier_fingerprint(grid) -> int:
+    """
+    Get a checksum of the barrier layout of a grid, to tell if saved tables were computed for it.
+    Args:
+        grid (CompactGrid): The grid.
+    Returns:
+        int: The CRC-32 of the barrier plane.
+    """
+    return zlib.crc32(bytes(grid.state).translate(_BARRIER_BYTES))
+
+def select_landmarks(grid, count: int) -> list[int]:
+    """
+    Pick landmarks far away from each other (farthest-point selection): the first one is the farthest cell
+    from an arbitrary free cell, and every next one is the cell farthest from all the landmarks picked so far.
+    Landmarks on the edges of the map give the tightest bounds.
+    Args:
+        grid (CompactGrid): The grid.
+        count (int): The number of landmarks to pick.
+    Returns:
+        list[int]: The landmark cells (fewer than `count` if the grid has fewer free cells).
+    """
+    size = grid.rows * grid.cols
+    seed = next((cell for cell in range(size) if not grid.is_barrier(cell)), None)
+    if seed is None:
+        return []
+
+    seed_distance = distance_field(grid, seed)
+    landmarks = [max(range(size), key=seed_distance.__getitem__)]
+    # the distance from every cell to its nearest landmark
+    nearest = distance_field(grid, landmarks[0])
+    while len(landmarks) < count:
+        farthest = max(range(size), key=nearest.__getitem__)
+        if nearest[farthest] <= 0:
+            break  # every reachable cell is already a landmark
+        landmarks.append(farthest)
+        for cell, distance in enumerate(distance_field(grid, farthest)):
+            if distance != UNREACHABLE and distance < nearest[cell]:
+                nearest[cell] = distance
+    return landmarks
+
+class LandmarkHeuristic:
+    def __init__(self, grid, landmarks: list[int], tables: list[array] | None = None):
+        """
+        An admissible heuristic built from the exact distances between a few landmarks and every cell.
+        It can be passed as the `heuristic` of astar, ida and bidirectional_astar. The tables count moves, and every
+        move costs at least 1, so the bounds stay admissible on weighted grids. Its tables describe the
+        barriers of the grid when they were computed: after barriers change it falls back to the Manhattan
+        (or octile) distance until rebuild() is called.
+        Args:
+            grid (CompactGrid): The grid the tables are computed for.
+            landmarks (list[int]): The landmark cells (see select_landmarks).
+            tables (list[array] | None): Precomputed distance tables, one per landmark, or None to compute them.
+        """
+        self.grid = grid
+        self.cols: int = grid.cols
+        self.landmarks: list[int] = list(landmarks)
+        self.tables: list[array] = tables if tables is not None else []
+        self.version: int = grid.version  # the grid version the tables were computed for
+        if tables is None:
+            self.rebuild()
+
+    @classmethod
+    def build(cls, grid, count: int = 8) -> "LandmarkHeuristic":
+        """
+        Pick `count` landmarks on a grid and compute their tables.
+        Args:
+            grid (CompactGrid): The grid.
+            count (int): The number of landmarks (more give tighter bounds, at count * 2 bytes per cell).
+        Returns:
+            LandmarkHeuristic: The heuristic.
+        """
+        return cls(grid, select_landmarks(grid, count))
+
+    def rebuild(self) -> None:
+        """
+        Compute the distance tables again for the current barriers, with the same landmarks.
+        Returns:
+            None
+        """
+        fields = [distance_field(self.grid, landmark) for landmark in self.landmarks]
+        # store the distances in the smallest unsigned type that fits them, the largest value meaning unreachable
+        typecode = 'H' if all(max(distance) < 0xFFFF for distance in fields) else 'I'
+        unreachable = _UNREACHABLE[typecode]
+        self.tables = [array(typecode, (unreachable if value == UNREACHABLE else value for value in distance))
+                       for distance in fields]
+        self.version = self.grid.version
+
+    def is_current(self) -> bool:
+        """
+        Checks if the tables still describe the barriers of the grid.
+        Returns:
+            bool: True if no barrier changed since the tables were computed.
+        """
+        return self.version == self.grid.version
+
+    def __call__(self, p1: tuple[int, int], p2: tuple[int, int]) -> float:
+        """
+        Estimate the distance between two positions.
+        Args:
+            p1 (tuple[int, int]): The first position (row, col).
+            p2 (tuple[int, int]): The second position (row, col).
+        Returns:
+            float: The largest of the landmark bounds and the distance matching the moves of the grid.
+        """
+        best = default_heuristic(self.grid)(p1, p2)
+        if self.version != self.grid.version:
+            return best
+
+        a = p1[0] * self.cols + p1[1]
+        b = p2[0] * self.cols + p2[1]
+        for table in self.tables:
+            distance_a, distance_b = table[a], table[b]
+            if distance_a == _UNREACHABLE[table.typecode] or distance_b == _UNREACHABLE[table.typecode]:
+                continue
+            bound = distance_a - distance_b if distance_a > distance_b else distance_b - distance_a
+            if bound > best:
+                best = bound
+        return best
+
+    def save(self, path: str) -> None:
+        """
+        Write the landmarks and their tables to a binary file, to skip computing them on the next run.
+        Args:
+            path (str): The file to write.
+        Returns:
+            None
+        Raises:
+            ValueError: If barriers changed since the tables were computed.
+        """
+        if not self.is_current():
+            raise ValueError("the landmark tables are out of date, rebuild() them before saving")
+        typecode = self.tables[0].typecode if self.tables else 'H'
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, self.grid.rows, self.grid.cols, len(self.landmarks),
+                                    barrier_fingerprint(self.grid), self.grid.connectivity,
+                                    self.grid.corner_cutting, typecode.encode()))
+            array('I', self.landmarks).tofile(file)
+            for table in self.tables:
+                table.tofile(file)
+
+    @classmethod
+    def load(cls, path: str, grid) -> "LandmarkHeuristic":
+        """
+        Read landmarks and tables written by save().
+        Args:
+            path (str): The file to read.
+            grid (CompactGrid): The grid the tables were computed for.
+        Returns:
+            LandmarkHeuristic: The heuristic.
+        Raises:
+            ValueError: If the file is not a table file, or was computed for another grid, barrier layout
+                or connectivity.
+        """
+        size = grid.rows * grid.cols
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f"{path} is not a landmark table file")
+            magic, rows, cols, count, fingerprint, connectivity, corner_cutting, typecode = _HEADER.unpack(header)
+            typecode = typecode.decode()
+            if magic != _MAGIC or typecode not in _UNREACHABLE:
+                raise ValueError(f"{path} is not a landmark table file")
+            if (rows, cols) != (grid.rows, grid.cols) or fingerprint != barrier_fingerprint(grid):
+                raise ValueError(f"{path} was computed for another grid or barrier layout")
+            # tables counting 4-connected moves overestimate the distances once diagonal moves are allowed
+            if (connectivity, corner_cutting) != (grid.connectivity, grid.corner_cutting):
+                raise ValueError(f"{path} was computed for another connectivity or corner cutting")
+
+            landmarks = array('I')
+            landmarks.fromfile(file, count)
+            tables = []
+            for _ in range(count):
+                table = array(typecode)
+                table.fromfile(file, size)
+                tables.append(table)
+        return cls(grid, list(landmarks), tables)
@@ -1,6 +1,8 @@
 from utils import *
 from grid import Grid
 from searching_algorithms import *
+from compact_grid import PATH, DEFAULT_COST
+from path_cache import PathCache
 
 if __name__ == "__main__":
     pygame.font.init()
@@ -12,6 +14,7 @@ if __name__ == "__main__":
     ROWS = 50
     COLS = 50
     grid = Grid(WIN, ROWS, COLS, WIDTH, HEIGHT)
+    grid.build_adjacency()  # kept up to date as barriers are painted, so a search starts without any setup
 
     start = None
     end = None
@@ -27,6 +30,15 @@ if __name__ == "__main__":
     button_ids = pygame.Rect(630, HEIGHT + 10, 90, 30)
     button_ida = pygame.Rect(730, HEIGHT + 10, 90, 30)
     button_clear = pygame.Rect(10, HEIGHT + 45, 150, 25)
+    button_lpa = pygame.Rect(170, HEIGHT + 45, 90, 25)
+    button_jps = pygame.Rect(270, HEIGHT + 45, 90, 25)
+    button_jps_plus = pygame.Rect(370, HEIGHT + 45, 90, 25)
+    button_bi_bfs = pygame.Rect(470, HEIGHT + 45, 90, 25)
+    button_bi_astar = pygame.Rect(570, HEIGHT + 45, 90, 25)
+    button_hpa = pygame.Rect(670, HEIGHT + 45, 90, 25)
+    button_theta = pygame.Rect(10, HEIGHT + 80, 90, 25)
+    button_lazy_theta = pygame.Rect(110, HEIGHT + 80, 120, 25)
+    button_race = pygame.Rect(240, HEIGHT + 80, 90, 25)
 
     buttons = [
         (button_bfs, "BFS"),
@@ -37,7 +49,16 @@ if __name__ == "__main__":
         (button_dijkstra, "Dijkstra"),
         (button_ids, "IDS"),
         (button_ida, "IDA*"),
-        (button_clear, "CLEAR GRID")
+        (button_clear, "CLEAR GRID"),
+        (button_lpa, "LPA*"),
+        (button_jps, "JPS"),
+        (button_jps_plus, "JPS+"),
+        (button_bi_bfs, "Bi-BFS"),
+        (button_bi_astar, "Bi-A*"),
+        (button_hpa, "HPA*"),
+        (button_theta, "Theta*"),
+        (button_lazy_theta, "Lazy Theta*"),
+        (button_race, "Race")
     ]
 
     def draw_interface():
@@ -48,35 +69,195 @@ if __name__ == "__main__":
             WIN.blit(font.render(text, True, (0, 0, 0)),
                      (rect.x + 10, rect.y + 5))
 
-    def draw_grid_only():
-        pygame.draw.rect(WIN, COLORS2['UNVISITED'], (0, 0, WIDTH, HEIGHT))
-        
-        for row in grid.grid:
-            for spot in row:
-                spot.draw(WIN)
-        
-        grid.draw_grid_lines()
-    
-    def draw_algorithm_step():
-        draw_grid_only()
-        pygame.display.update(pygame.Rect(0, 0, WIDTH, HEIGHT))
+    # results of the previous runs; painting or erasing a barrier bumps the grid version and invalidates them
+    path_cache = PathCache(grid, capacity=64)
+
+    def run_algorithm(algorithm, **options):
+        # the search runs on a worker thread and its steps are recorded; the main loop plays them back frame by frame
+        result = path_cache.get(algorithm, start.index, end.index, **options)
+        if result is None:
+            query = (start.index, end.index)
+
+            def search(observer):
+                result = algorithm(observer, grid, start, end, **options)
+                path_cache.put(algorithm, *query, result, **options)
+                return result
+
+            recorder = Recorder(*query)
+            return Animation(grid, recorder.events, SearchThread(search, recorder))
+        else:
+            # same query on an unchanged grid: show the cached path instead of searching again
+            cells = result.path
+            if algorithm in (theta_star, lazy_theta_star):
+                # the path holds the waypoints only: fill in the segments between them
+                cells = [cell for a, b in zip(cells, cells[1:]) for cell in any_angle.segment_cells(grid, a, b)
+                         if not grid.is_barrier(cell)]
+            for cell in cells:
+                if cell != start.index and cell != end.index:
+                    grid.set_state(cell, PATH)
+            return None
+
+    # the connected regions of the grid: a search between two of them stops at once instead of exhausting the region
+    components = ComponentIndex(grid)
+
+    # the jumps of JPS+, rebuilt when a barrier is painted or erased
+    jump_table = JumpTable(grid)
+
+    # the cluster abstraction of HPA*, rebuilt cluster by cluster when a barrier is painted or erased
+    abstraction = HPAStar(grid, cluster_size=10)
+
+    # the heuristics of A*, Bi-A* and IDA*, switched with the H key; the landmark tables are rebuilt when barriers changed
+    landmarks = LandmarkHeuristic(grid, [])
+    # the first one follows the moves of the grid: Manhattan when 4-connected, octile when 8-connected
+    heuristics = [("Manhattan / octile", None), ("Euclidean", h_euclidian_distance), ("Landmarks", landmarks)]
+    heuristic_index = 0
+
+    def current_heuristic():
+        heuristic = heuristics[heuristic_index][1] or default_heuristic(grid)
+        if heuristic is landmarks and (not landmarks.landmarks or not landmarks.is_current()):
+            landmarks.landmarks = select_landmarks(grid, 8)
+            landmarks.rebuild()
+        return heuristic
+
+    # the LPA* planner keeps its search between runs, as long as the start and end stay the same
+    planner = None
+
+    # the algorithms a race can run, by the name on their button: their function, and their extra arguments for the
+    # copy of the grid they search (see Race in searching_algorithms.py)
+    def ida_options(copy):
+        heuristic = current_heuristic()
+        return {'initial_threshold': heuristic(start.get_position(), end.get_position()), 'heuristic': heuristic}
+
+    race_entrants = {
+        "BFS": (bfs, lambda copy: {}),
+        "DFS": (dfs, lambda copy: {}),
+        "A*": (astar, lambda copy: {'heuristic': current_heuristic()}),
+        "DLS": (dls, lambda copy: {'limit': 1000}),
+        "UCS": (ucs, lambda copy: {}),
+        "Dijkstra": (dijkstra, lambda copy: {}),
+        "IDS": (ids, lambda copy: {'max_depth': 1000}),
+        "IDA*": (ida, ida_options),
+        "LPA*": (lpa_star, lambda copy: {'planner': LPAStar(copy, start.index, end.index)}),
+        "JPS": (jps, lambda copy: {}),
+        "JPS+": (jps_plus, lambda copy: {'table': JumpTable(copy)}),
+        "Bi-BFS": (bidirectional_bfs, lambda copy: {}),
+        "Bi-A*": (bidirectional_astar, lambda copy: {'heuristic': current_heuristic()}),
+        "HPA*": (hpa_star, lambda copy: {'abstraction': HPAStar(copy, cluster_size=10)}),
+        "Theta*": (theta_star, lambda copy: {}),
+        "Lazy Theta*": (lazy_theta_star, lambda copy: {}),
+    }
+    # the algorithms of the next race: the R key switches the algorithm buttons to picking them (up to 4)
+    race_picks = ["BFS", "A*", "Dijkstra", "Bi-A*"]
+    picking = False
+
+    # the race shown over the grid, if any; it stays on screen once over, until a button or the grid is clicked
+    race = None
+
+    # how agents move, switched with the C key: 4-connected, 8-connected, 8-connected cutting corners
+    connectivities = [(4, False), (8, False), (8, True)]
+    connectivity_index = 0
+
+    # what the left button paints once the start and end are placed: barriers (None) or terrain of a cost
+    brush_cost = None
+
+    # how many cells are expanded (or added to the path) per frame while a search is played back, switched with the
+    # up and down arrow keys; None shows the whole search at once
+    speeds = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, None]
+    speed_index = 4
+
+    # the search being played back (and maybe still running), if any; space pauses it and escape cancels it
+    animation = None
+    paused = False
 
     run = True
     started = False
 
+    clock = pygame.time.Clock()
+    draw_interface()
+    pygame.display.flip()
+
     while run:
-        draw_grid_only()  
-        draw_interface() 
-        
-        pygame.display.flip()
+        if animation is not None and not paused:
+            animation.advance(speeds[speed_index])
+            if animation.done:
+                if animation is race:
+                    print(race.report())
+                elif animation.task is not None and animation.task.error is not None:
+                    print(f"Search failed: {animation.task.error}")
+                animation = None
+        started = animation is not None
+
+        pygame.display.update(race.draw_changes() if race is not None else grid.draw_changes())
+        clock.tick(FPS)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
 
+            if event.type == pygame.WINDOWEXPOSED:
+                # the window was covered or restored: everything must be painted again
+                grid.full_redraw = True
+                draw_interface()
+                pygame.display.flip()
+
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_UP, pygame.K_DOWN):
+                step = 1 if event.key == pygame.K_UP else -1
+                speed_index = min(max(speed_index + step, 0), len(speeds) - 1)
+                speed = speeds[speed_index]
+                print("Speed: instant" if speed is None else f"Speed: {speed} steps per frame")
+
+            if started and event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                paused = not paused
+                if paused:
+                    animation.pause()
+                else:
+                    animation.resume()
+                print("Paused" if paused else "Resumed")
+
+            if started and (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                            or event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+                            and any(rect.collidepoint(event.pos) for rect, _ in buttons)):
+                # escape, or another algorithm (or CLEAR GRID) chosen while a search runs: stop it at once
+                animation.cancel()
+                print("Search cancelled")
+                animation = None
+                paused = False
+                started = False
+
             if started:
                 continue
 
+            if race is not None and (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                                     or event.type == pygame.MOUSEBUTTONDOWN):
+                # back from the race to the grid
+                race = None
+                grid.full_redraw = True
+                if event.type == pygame.KEYDOWN or event.pos[1] < HEIGHT:
+                    continue
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                picking = not picking
+                if picking:
+                    race_picks = []
+                    print("Race: click up to 4 algorithms, then Race (or R again to stop picking)")
+                else:
+                    print("Race: " + ", ".join(race_picks))
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                heuristic_index = (heuristic_index + 1) % len(heuristics)
+                print(f"Heuristic: {heuristics[heuristic_index][0]}")
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                connectivity_index = (connectivity_index + 1) % len(connectivities)
+                connectivity, corner_cutting = connectivities[connectivity_index]
+                grid.set_connectivity(connectivity, corner_cutting)
+                print(f"Moves: {connectivity}-connected" + (", cutting corners" if corner_cutting else ""))
+
+            if event.type == pygame.KEYDOWN and pygame.K_0 <= event.key <= pygame.K_9:
+                # 0 paints barriers, 1 to 9 paint terrain of that cost (1 is plain ground)
+                brush_cost = event.key - pygame.K_0 or None
+                print("Brush: barriers" if brush_cost is None else f"Brush: terrain of cost {brush_cost}")
+
             if pygame.mouse.get_pressed()[0]: 
                 pos = pygame.mouse.get_pos()
                 
@@ -84,7 +265,7 @@ if __name__ == "__main__":
                     row, col = grid.get_clicked_pos(pos)
 
                     if 0 <= row < ROWS and 0 <= col < COLS:
-                        spot = grid.grid[row][col]
+                        spot = grid.spot(row, col)
                         if not start and spot != end:
                             start = spot
                             start.make_start()
@@ -92,7 +273,12 @@ if __name__ == "__main__":
                             end = spot
                             end.make_end()
                         elif spot != end and spot != start:
-                            spot.make_barrier()
+                            if brush_cost is None:
+                                spot.make_barrier()
+                            else:
+                                if spot.is_barrier():
+                                    spot.reset()
+                                spot.set_cost(brush_cost)
 
             elif pygame.mouse.get_pressed()[2]:  
                 pos = pygame.mouse.get_pos()
@@ -100,8 +286,9 @@ if __name__ == "__main__":
                 if pos[1] < HEIGHT:
                     row, col = grid.get_clicked_pos(pos)
                     if 0 <= row < ROWS and 0 <= col < COLS:
-                        spot = grid.grid[row][col]
+                        spot = grid.spot(row, col)
                         spot.reset()
+                        spot.set_cost(DEFAULT_COST)
 
                         if spot == start:
                             start = None
@@ -111,75 +298,95 @@ if __name__ == "__main__":
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mouse_pos = event.pos
                 
-                if button_bfs.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    bfs(draw_algorithm_step, grid, start, end)
-                    started = False
+                picked = next((text for rect, text in buttons
+                               if text in race_entrants and rect.collidepoint(mouse_pos)), None)
+
+                if picking and picked is not None:
+                    if picked in race_picks:
+                        race_picks.remove(picked)
+                    elif len(race_picks) < 4:
+                        race_picks.append(picked)
+                    print("Race: " + ", ".join(race_picks))
+
+                elif button_race.collidepoint(mouse_pos) and start and end and not started:
+                    picking = False
+                    if not race_picks:
+                        print("Race: pick some algorithms first (R key)")
+                    else:
+                        race = Race(WIN, pygame.Rect(0, 0, WIDTH, HEIGHT), grid, start, end,
+                                    [(name, *race_entrants[name]) for name in race_picks], font)
+                        animation = race
+
+                elif button_bfs.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(bfs)
                 
                 elif button_dfs.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    dfs(draw_algorithm_step, grid, start, end)
-                    started = False
+                    animation = run_algorithm(dfs)
                 
                 elif button_astar.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    astar(draw_algorithm_step, grid, start, end)
-                    started = False
+                    animation = run_algorithm(astar, heuristic=current_heuristic())
                 
                 elif button_dls.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    dls(draw_algorithm_step, grid, start, end, limit=1000)
-                    started = False
+                    animation = run_algorithm(dls, limit=1000)
                 
                 elif button_ucs.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    ucs(draw_algorithm_step, grid, start, end)
-                    started = False
+                    animation = run_algorithm(ucs)
                 
                 elif button_dijkstra.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    dijkstra(draw_algorithm_step, grid, start, end)
-                    started = False
+                    animation = run_algorithm(dijkstra)
                 
                 elif button_ids.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    ids(draw_algorithm_step, grid, start, end, max_depth=1000)
-                    started = False
+                    animation = run_algorithm(ids, max_depth=1000)
                 
                 elif button_ida.collidepoint(mouse_pos) and start and end and not started:
-                    started = True
-                    for row in grid.grid:
-                        for spot in row:
-                            spot.update_neighbors(grid.grid)
-                    initial_threshold = h_manhattan_distance(start.get_position(), end.get_position())
-                    ida(draw_algorithm_step, grid, start, end, initial_threshold)
-                    started = False
+                    heuristic = current_heuristic()
+                    initial_threshold = heuristic(start.get_position(), end.get_position())
+                    animation = run_algorithm(ida, initial_threshold=initial_threshold, heuristic=heuristic)
                 
+                elif button_lpa.collidepoint(mouse_pos) and start and end and not started:
+                    if planner is None or planner.start != start.index or planner.end != end.index:
+                        if planner is not None:
+                            planner.close()
+                        planner = LPAStar(grid, start.index, end.index)
+                    animation = run_algorithm(lpa_star, planner=planner)
+
+                elif (any(button.collidepoint(mouse_pos) for button in (button_jps, button_jps_plus, button_hpa))
+                      and (not grid.is_uniform() or grid.connectivity != 4)):
+                    print("JPS, JPS+ and HPA* need a 4-connected grid without terrain costs")
+
+                elif (any(button.collidepoint(mouse_pos) for button in (button_theta, button_lazy_theta))
+                      and not grid.is_uniform()):
+                    print("Theta* and Lazy Theta* need a grid without terrain costs")
+
+                elif button_jps.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(jps)
+
+                elif button_jps_plus.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(jps_plus, table=jump_table)
+
+                elif button_bi_bfs.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(bidirectional_bfs)
+
+                elif button_bi_astar.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(bidirectional_astar, heuristic=current_heuristic())
+
+                elif button_hpa.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(hpa_star, abstraction=abstraction)
+
+                elif button_theta.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(theta_star)
+
+                elif button_lazy_theta.collidepoint(mouse_pos) and start and end and not started:
+                    animation = run_algorithm(lazy_theta_star)
+
                 elif button_clear.collidepoint(mouse_pos):
                     print("Clearing the grid...")
                     start = None
                     end = None
                     grid.reset()
 
+                started = animation is not None
+
+    if animation is not None:
+        animation.cancel()
     pygame.quit()
\ No newline at end of file
@@ -0,0 +1,139 @@
+from heapq import heappush, heappop
+
+class OpenList:
+    def __init__(self):
+        """
+        The open list (frontier) of a best-first search: a single-threaded min-priority queue of cells.
+        Pushing a cell that is already queued with a better priority replaces it (decrease-key):
+        the old heap entry is left in place and skipped when it is popped (lazy deletion).
+        Cells with the same priority are popped in the order they were pushed.
+        """
+        self._heap: list = []
+        self._priority: dict = {}  # the current priority of every queued cell
+        self._count: int = 0       # tie-breaker, so cells themselves are never compared
+
+    def push(self, cell, priority: float) -> None:
+        """
+        Queue a cell, or lower its priority if it is already queued.
+        Args:
+            cell: The cell to queue.
+            priority (float): The priority of the cell (lower is popped first).
+        Returns:
+            None
+        """
+        self._priority[cell] = priority
+        self._count += 1
+        heappush(self._heap, (priority, self._count, cell))
+
+    def pop(self) -> tuple:
+        """
+        Remove the cell with the lowest priority.
+        Returns:
+            tuple: The cell and its priority.
+        """
+        heap = self._heap
+        queued = self._priority
+        while True:
+            priority, _, cell = heappop(heap)
+            if queued.get(cell) == priority:
+                del queued[cell]
+                return cell, priority
+            # otherwise the entry is stale: the cell was pushed again with a better priority, or already popped
+
+    def peek(self) -> tuple:
+        """
+        Get the cell with the lowest priority without removing it.
+        Returns:
+            tuple: The cell and its priority, or (None, None) if the list is empty.
+        """
+        heap = self._heap
+        queued = self._priority
+        while heap:
+            priority, _, cell = heap[0]
+            if queued.get(cell) == priority:
+                return cell, priority
+            heappop(heap)  # drop the stale entry
+        return None, None
+
+    def remove(self, cell) -> None:
+        """
+        Remove a cell from the list, if it is queued. Its heap entry becomes stale and is skipped later.
+        Args:
+            cell: The cell to remove.
+        Returns:
+            None
+        """
+        self._priority.pop(cell, None)
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._priority
+
+    def __len__(self) -> int:
+        return len(self._priority)
+
+    def __bool__(self) -> bool:
+        return bool(self._priority)
+
+class BucketQueue:
+    def __init__(self):
+        """
+        An open list for integer priorities (Dial's algorithm): one bucket of cells per priority value,
+        so push and pop are O(1) instead of O(log n). It has the same interface as OpenList and is the
+        better choice on grids whose move costs are small integers, with an integer heuristic (or none).
+        Cells with the same priority are popped last-in first-out.
+        """
+        self._buckets: list = []   # bucket i holds the cells queued with priority i (None until first used)
+        self._priority: dict = {}  # the current priority of every queued cell
+        self._cursor: int = 0      # every bucket below the cursor is empty
+
+    def push(self, cell, priority: int) -> None:
+        """
+        Queue a cell, or lower its priority if it is already queued.
+        Args:
+            cell: The cell to queue.
+            priority (int): The priority of the cell, a non-negative integer (lower is popped first).
+                A float with an integral value, like a cost read from a SearchScratch, is accepted too.
+        Returns:
+            None
+        """
+        priority = int(priority)
+        self._priority[cell] = priority
+        buckets = self._buckets
+        if priority >= len(buckets):
+            buckets.extend([None] * (priority + 1 - len(buckets)))
+        bucket = buckets[priority]
+        if bucket is None:
+            buckets[priority] = [cell]
+        else:
+            bucket.append(cell)
+        if priority < self._cursor:
+            self._cursor = priority
+
+    def pop(self) -> tuple:
+        """
+        Remove a cell with the lowest priority.
+        Returns:
+            tuple: The cell and its priority.
+        """
+        buckets = self._buckets
+        queued = self._priority
+        cursor = self._cursor
+        while True:
+            bucket = buckets[cursor]
+            while bucket:
+                cell = bucket.pop()
+                if queued.get(cell) == cursor:
+                    del queued[cell]
+                    self._cursor = cursor
+                    return cell, cursor
+                # otherwise the entry is stale, like in OpenList
+            cursor += 1
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._priority
+
+    def __len__(self) -> int:
+        return len(self._priority)
+
+    def __bool__(self) -> bool:
+        return bool(self._priority)
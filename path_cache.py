@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from engine import SearchResult
+
+class PathCache:
+    def __init__(self, grid, capacity: int = 1024):
+        """
+        A bounded cache of search results on one grid, evicting the least recently used entry when full.
+        Entries are keyed by (grid version, algorithm, options, start, end). Painting or erasing a barrier
+        bumps the grid's version, which invalidates every entry at once, so a cached result always
+        describes the current layout.
+        Args:
+            grid (CompactGrid): The grid the results are computed on.
+            capacity (int): The maximum number of cached results.
+        """
+        self.grid = grid
+        self.capacity: int = capacity
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._version: int = grid.version  # the grid version of every entry in the cache
+
+    def _key(self, algorithm: callable, start, end, options: dict) -> tuple:
+        """
+        Build the key of a query. The options (e.g. the heuristic or the queue type) must be hashable.
+        """
+        return self.grid.version, algorithm, tuple(sorted(options.items())), start, end
+
+    def _drop_stale(self) -> None:
+        """
+        Forget every entry if the grid changed since they were stored.
+        """
+        if self.grid.version != self._version:
+            self._entries.clear()
+            self._version = self.grid.version
+
+    def get(self, algorithm: callable, start, end, **options) -> SearchResult | None:
+        """
+        Look up the cached result of a query.
+        Args:
+            algorithm (callable): The search the result was computed with.
+            start: The starting cell.
+            end: The ending cell.
+            **options: The extra arguments the search was run with.
+        Returns:
+            SearchResult | None: The cached result, or None if the query is not cached for the current grid.
+        """
+        self._drop_stale()
+        key = self._key(algorithm, start, end, options)
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, algorithm: callable, start, end, result: SearchResult, **options) -> None:
+        """
+        Store the result of a query, evicting the least recently used entry if the cache is full.
+        Args:
+            algorithm (callable): The search the result was computed with.
+            start: The starting cell.
+            end: The ending cell.
+            result (SearchResult): The result to store.
+            **options: The extra arguments the search was run with.
+        Returns:
+            None
+        """
+        self._drop_stale()
+        key = self._key(algorithm, start, end, options)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def solve(self, algorithm: callable, start, end, **options) -> SearchResult:
+        """
+        Get the result of a query from the cache, or run the search headless and cache it.
+        Args:
+            algorithm (callable): An engine search (e.g. engine.astar).
+            start: The starting cell.
+            end: The ending cell.
+            **options: Extra arguments given to the search.
+        Returns:
+            SearchResult: The result of the query.
+        """
+        result = self.get(algorithm, start, end, **options)
+        if result is None:
+            result = algorithm(self.grid, start, end, **options)
+            self.put(algorithm, start, end, result, **options)
+        return result
+
+    def clear(self) -> None:
+        """
+        Forget every entry.
+        Returns:
+            None
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        self._drop_stale()
+        return len(self._entries)
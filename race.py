@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from engine import SearchResult
+from batch import share_grid, attach_grid
+
+# A race runs several algorithms on the same query and compares them. Headless, every algorithm gets its own worker
+# process, so they really run at the same time; the grid is placed once in shared memory (see batch.py) and each
+# process searches its own view of it.
+
+class RaceResult:
+    def __init__(self, name: str, result: SearchResult | None, elapsed: float, error: str | None = None):
+        """
+        The outcome of one algorithm of a race.
+        Args:
+            name (str): The name the algorithm was entered under.
+            result (SearchResult | None): The result of its search (None if it failed).
+            elapsed (float): The time its search took, in seconds.
+            error (str | None): Why the search failed, if it did (e.g. JPS on a weighted grid).
+        """
+        self.name: str = name
+        self.result: SearchResult | None = result
+        self.elapsed: float = elapsed
+        self.error: str | None = error
+
+    @property
+    def expanded(self) -> int:
+        return self.result.expanded if self.result is not None else 0
+
+    @property
+    def path_length(self) -> int | None:
+        """
+        The number of cells of the path after the start (None if no path was found).
+        """
+        return len(self.result.path) - 1 if self.result else None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"RaceResult({self.name!r}, error={self.error!r})"
+        return (f"RaceResult({self.name!r}, found={bool(self.result)}, cost={self.result.cost}, "
+                f"expanded={self.expanded}, path_length={self.path_length}, elapsed={self.elapsed:.3f}s)")
+
+def race_report(results: list[RaceResult]) -> str:
+    """
+    Format the results of a race as a table, fastest first.
+    Args:
+        results (list[RaceResult]): The results of the race.
+    Returns:
+        str: One line per algorithm: its name, expanded cells, path length, path cost and time.
+    """
+    lines = [f"{'algorithm':<18}{'expanded':>10}{'path':>8}{'cost':>10}{'time':>11}"]
+    for entry in sorted(results, key=lambda entry: (entry.error is not None, entry.elapsed)):
+        if entry.error is not None:
+            lines.append(f"{entry.name:<18}  failed: {entry.error}")
+        elif not entry.result:
+            lines.append(f"{entry.name:<18}{entry.expanded:>10}{'-':>8}{'-':>10}{entry.elapsed * 1000:>9.1f}ms")
+        else:
+            lines.append(f"{entry.name:<18}{entry.expanded:>10}{entry.path_length:>8}{entry.result.cost:>10.4g}"
+                         f"{entry.elapsed * 1000:>9.1f}ms")
+    return "\n".join(lines)
+
+def _run_entrant(grid, start: int, end: int, name: str, search: callable) -> RaceResult:
+    """
+    Run one algorithm of a race and time it.
+    """
+    began = perf_counter()
+    try:
+        result = search(grid, start, end)
+    except ValueError as error:
+        return RaceResult(name, None, perf_counter() - began, str(error))
+    return RaceResult(name, result, perf_counter() - began)
+
+# every worker process attaches to the shared grid once, when it starts
+_racer_memory = None
+_racer_grid = None
+
+def _init_racer(memory_name: str, rows: int, cols: int, connectivity: int, corner_cutting: bool) -> None:
+    """
+    Prepare a worker process: attach to the shared state and cost planes.
+    """
+    global _racer_memory, _racer_grid
+    _racer_memory, _racer_grid = attach_grid(memory_name, rows, cols, connectivity, corner_cutting)
+
+def _race_in_worker(start: int, end: int, name: str, search: callable) -> RaceResult:
+    return _run_entrant(_racer_grid, start, end, name, search)
+
+def race(grid, start: int, end: int, entrants: dict[str, callable], processes: bool = True) -> list[RaceResult]:
+    """
+    Run several algorithms on the same query, all at once, and compare their expanded cells, paths and times.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        entrants (dict[str, callable]): The algorithms by name. Each one is called as search(grid, start, end) and
+            returns a SearchResult: an engine search, or a functools.partial of one to give it options. With
+            processes, they must be picklable (module-level functions, or partials of them).
+        processes (bool): Run every algorithm in its own worker process (True), or one after the other in this one.
+    Returns:
+        list[RaceResult]: The result of every algorithm, in the order of the entrants. An algorithm that cannot
+        search this grid (it raises ValueError) is reported with its error.
+    """
+    if not processes:
+        if grid.adjacency is None:
+            grid.build_adjacency()
+        return [_run_entrant(grid, start, end, name, search) for name, search in entrants.items()]
+
+    memory = share_grid(grid)
+    try:
+        with ProcessPoolExecutor(max_workers=max(len(entrants), 1), initializer=_init_racer,
+                                 initargs=(memory.name, grid.rows, grid.cols, grid.connectivity,
+                                           grid.corner_cutting)) as executor:
+            futures = [executor.submit(_race_in_worker, start, end, name, search) for name, search in entrants.items()]
+            return [future.result() for future in futures]
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,82 @@
+from array import array
+
+class StampedTable:
+    def __init__(self, size: int, typecode: str):
+        """
+        A mapping from cell indices to numbers, backed by flat arrays and reusable between searches.
+        Every entry carries the generation it was written in, so clear() is O(1): it only starts a new
+        generation, and the entries of the previous ones stop counting.
+        It supports the part of the dict interface used by the engine (get, [], in).
+        Args:
+            size (int): The number of cells of the grid.
+            typecode (str): The array typecode of the values ('d' for costs, 'q' for cell indices).
+        """
+        self._values: array = array(typecode, bytes(array(typecode).itemsize * size))
+        self._stamps: array = array('I', bytes(4 * size))
+        self._generation: int = 1
+
+    def clear(self) -> None:
+        """
+        Forget every entry, in O(1).
+        Returns:
+            None
+        """
+        self._generation += 1
+        if self._generation == 1 << 32:
+            # the stamps would overflow: wipe them once and start again
+            self._stamps = array('I', bytes(len(self._stamps) * 4))
+            self._generation = 1
+
+    def get(self, cell: int, default=None):
+        if self._stamps[cell] == self._generation:
+            return self._values[cell]
+        return default
+
+    def __contains__(self, cell: int) -> bool:
+        return self._stamps[cell] == self._generation
+
+    def __getitem__(self, cell: int):
+        if self._stamps[cell] != self._generation:
+            raise KeyError(cell)
+        return self._values[cell]
+
+    def __setitem__(self, cell: int, value) -> None:
+        self._stamps[cell] = self._generation
+        self._values[cell] = value
+
+class SearchScratch:
+    def __init__(self, size: int):
+        """
+        The per-search score storage of the engine (cost so far and parent links), allocated once
+        and reset in O(1) between searches. Pass it to a search with scratch=... when running many
+        queries on the same grid; without it, the engine allocates small dicts that only hold the visited cells.
+        Args:
+            size (int): The number of cells of the grid (rows * cols).
+        """
+        self.g_score: StampedTable = StampedTable(size, 'd')
+        self.came_from: StampedTable = StampedTable(size, 'q')
+
+    def clear(self) -> None:
+        """
+        Forget the scores of the previous search, in O(1).
+        Returns:
+            None
+        """
+        self.g_score.clear()
+        self.came_from.clear()
+
+def score_tables(start, scratch) -> tuple:
+    """
+    Get the tables holding the cost so far and the parent of every reached cell, for a new search.
+    They are allocated lazily (only reached cells are stored), or reused from `scratch` and reset in O(1).
+    Args:
+        start: The starting cell.
+        scratch (SearchScratch | None): Reusable storage, or None to allocate dicts.
+    Returns:
+        tuple: The g_score and came_from tables, with the start already at cost 0.
+    """
+    if scratch is None:
+        return {start: 0}, {}
+    scratch.clear()
+    scratch.g_score[start] = 0
+    return scratch.g_score, scratch.came_from
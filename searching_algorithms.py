@@ -1,437 +1,392 @@
+from time import thread_time
 from utils import *
-from collections import deque
-from queue import PriorityQueue
 from grid import Grid
 from spot import Spot
-from math import sqrt
-
-def bfs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
+import engine
+from incremental import LPAStar
+import jps as jump_point_search
+import any_angle
+from jps import JumpTable
+from hpa import HPAStar
+from components import ComponentIndex
+from animation import Recorder, Animation, SearchThread
+from race import RaceResult, race_report
+from landmarks import LandmarkHeuristic, select_landmarks
+from engine import SearchObserver, SearchResult, h_manhattan_distance, h_euclidian_distance, h_octile_distance, default_heuristic
+
+# The algorithms themselves live in engine.py and know nothing about pygame.
+# The functions below run them on the spots of the Pygame grid; every step is reported to the observer, usually a
+# Recorder (animation.py) whose events the main loop plays back a few steps per frame.
+
+def bfs(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
     """
     Breadth-First Search (BFS) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    queue = deque([start])
-    visited = {start}
-    came_from = {}
-
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = queue.popleft()
-        
-        if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-
-            end.make_end()
-            start.make_start()
-            return True
-        
-        for neighbor in current.neighbors:
-            if neighbor not in visited and not neighbor.is_barrier():
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                queue.append(neighbor)
-                neighbor.make_open()
+    return engine.bfs(grid, start.index, end.index, observer)
 
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
+def bidirectional_bfs(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
+    """
+    Bidirectional Breadth-First Search: one BFS from each end, stopping where they meet.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
+    """
+    return engine.bidirectional_bfs(grid, start.index, end.index, observer)
 
-def dfs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
+def dfs(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
     """
     Depdth-First Search (DFS) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    stack = [start]
-    visited = {start}
-    came_from = {}
+    return engine.dfs(grid, start.index, end.index, observer)
 
-    while stack:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = stack.pop()
-
-        if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor not in visited and not neighbor.is_barrier():
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                stack.append(neighbor)
-                neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-def h_manhattan_distance(p1: tuple[int, int], p2: tuple[int, int]) -> float:
+def astar(observer: SearchObserver, grid: Grid, start: Spot, end: Spot,
+          heuristic: callable = None) -> SearchResult:
     """
-    Heuristic function for A* algorithm: uses the Manhattan distance between two points.
+    A* Pathfinding Algorithm.
     Args:
-        p1 (tuple[int, int]): The first point (x1, y1).
-        p2 (tuple[int, int]): The second point (x2, y2).
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        heuristic (callable): Estimates the cost between two (row, col) positions (by default, the one matching the moves of the grid).
     Returns:
-        float: The Manhattan distance between p1 and p2.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    return abs(p2[0] - p1[0]) + abs(p2[1] - p1[1])
+    return engine.astar(grid, start.index, end.index, observer, heuristic=heuristic)
 
-def h_euclidian_distance(p1: tuple[int, int], p2: tuple[int, int]) -> float:
+def bidirectional_astar(observer: SearchObserver, grid: Grid, start: Spot, end: Spot,
+                        heuristic: callable = None) -> SearchResult:
     """
-    Heuristic function for A* algorithm: uses the Euclidian distance between two points.
+    Bidirectional A*: one A* from each end, stopping once no cheaper path than the best meeting can remain.
     Args:
-        p1 (tuple[int, int]): The first point (x1, y1).
-        p2 (tuple[int, int]): The second point (x2, y2).
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        heuristic (callable): Estimates the cost between two (row, col) positions (by default, the one matching the moves of the grid).
     Returns:
-        float: The Manhattan distance between p1 and p2.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    return sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
-
+    return engine.bidirectional_astar(grid, start.index, end.index, observer, heuristic=heuristic)
 
-def astar(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
+def jps(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
     """
-    A* Pathfinding Algorithm.
+    Jump Point Search (JPS) Algorithm: an A* that only expands jump points, on a grid where every move costs 1.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    count = 0
-    open_heap = PriorityQueue()
-    open_heap.put((0, count, start))
-    came_from = {}
-
-    g_score = {spot : float('inf') for row in grid.grid for spot in row}
-    g_score[start] = 0
-
-    f_score = {spot : float('inf') for row in grid.grid for spot in row}
-    f_score[start] = h_manhattan_distance(start.get_position(), end.get_position())
-
-    open_set = {start}
-
-    while not open_heap.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
+    return jump_point_search.jps(grid, start.index, end.index, observer)
 
-        current = open_heap.get()[2]  # get the Spot from the heap
-        open_set.remove(current)
-
-        if current == end:
-            # Reconstruct path
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor.is_barrier():
-                continue
-
-            tentative_g_score = g_score[current] + 1  # cost = 1 for all moves
-            if tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + h_manhattan_distance(neighbor.get_position(), end.get_position())
-                if neighbor not in open_set:
-                    count += 1
-                    open_heap.put((f_score[neighbor], count, neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
+def jps_plus(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, table: JumpTable) -> SearchResult:
+    """
+    JPS+ Algorithm: Jump Point Search with jumps precomputed for every cell.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        table (JumpTable): The jump table of the grid, rebuilt on its own when barriers change.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
+    """
+    return jump_point_search.jps_plus(grid, start.index, end.index, table, observer)
 
-        draw()
+def hpa_star(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, abstraction: HPAStar) -> SearchResult:
+    """
+    Hierarchical Path-Finding A* (HPA*) Algorithm: an A* on the cluster abstraction of the grid, refined into cells.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        abstraction (HPAStar): The cluster abstraction of the grid, rebuilt on its own where barriers change.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
+    """
+    return abstraction.search(start.index, end.index, observer)
 
-        if current != start:
-            current.make_closed()
+def theta_star(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
+    """
+    Theta* Algorithm: any-angle A* whose path is made of straight segments between waypoints.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds the waypoints.
+    """
+    return any_angle.theta_star(grid, start.index, end.index, observer)
 
-    return False
+def lazy_theta_star(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
+    """
+    Lazy Theta* Algorithm: Theta* checking line of sight only when a cell is expanded.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds the waypoints.
+    """
+    return any_angle.lazy_theta_star(grid, start.index, end.index, observer)
 
-def dls(draw: callable, grid: Grid, start: Spot, end: Spot, limit: int) -> bool:
+def dls(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, limit: int) -> SearchResult:
     """
     Depth-Limited Search (DLS) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
         limit (int): The depth limit for the search.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    stack = [(start, 0)]    
-    visited = {start}
-    came_from = {}
-
-    while stack:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
+    return engine.dls(grid, start.index, end.index, limit, observer)
 
-        current, depth = stack.pop()
-
-        if current == end:
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        if depth < limit:
-            for neighbor in current.neighbors:
-                if not neighbor.is_barrier() and neighbor not in visited:
-                    visited.add(neighbor)
-                    came_from[neighbor] = current
-                    stack.append((neighbor, depth + 1))
-                    neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-def ucs(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
+def ucs(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
     """
-    Uninformed Cost Search (UCS) Algorithm.
+    Uniform Cost Search (UCS) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    count = 0
-    open_heap = PriorityQueue()
-    open_heap.put((0, count, start))
-    came_from = {}
-
-    cost_so_far = {spot : float('inf') for row in grid.grid for spot in row}
-    cost_so_far[start] = 0
-
-    open_set = {start}
-
-    while not open_heap.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_heap.get()[2]  # get the Spot from the heap
-        open_set.remove(current)
-
-        if current == end:
-            # Reconstruct path
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor.is_barrier():
-                continue
-
-            new_cost = cost_so_far[current] + 1  # cost = 1 for all moves
-            if new_cost < cost_so_far[neighbor]:
-                came_from[neighbor] = current
-                cost_so_far[neighbor] = new_cost
-                if neighbor not in open_set:
-                    count += 1
-                    open_heap.put((cost_so_far[neighbor], count, neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
+    return engine.ucs(grid, start.index, end.index, observer)
 
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-def dijkstra(draw: callable, grid: Grid, start: Spot, end: Spot) -> bool:
+def dijkstra(observer: SearchObserver, grid: Grid, start: Spot, end: Spot) -> SearchResult:
     """
     Dijkstra's Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
     Returns:
-        bool: True if a path is found, False otherwise.
-    """
-    count = 0
-    open_heap = PriorityQueue()
-    open_heap.put((0, count, start))
-    came_from = {}
-    distance = {spot : float('inf') for row in grid.grid for spot in row}
-    distance[start] = 0
-    open_set = {start}
-
-    while not open_heap.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_heap.get()[2]  # get the Spot from the heap
-        open_set.remove(current)
-
-        if current == end:
-            # Reconstruct path
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor.is_barrier():
-                continue
-
-            new_distance = distance[current] + 1  # cost = 1 for all moves
-            if new_distance < distance[neighbor]:
-                came_from[neighbor] = current
-                distance[neighbor] = new_distance
-                if neighbor not in open_set:
-                    count += 1
-                    open_heap.put((distance[neighbor], count, neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-def ids(draw: callable, grid: Grid, start: Spot, end: Spot, max_depth: int) -> bool:
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
+    """
+    return engine.dijkstra(grid, start.index, end.index, observer)
+
+def ids(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, max_depth: int) -> SearchResult:
     """
     Iterative Deepening Search (IDS) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
         max_depth (int): The maximum depth to search.
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    for depth in range(max_depth):
-        if dls(draw, grid, start, end, depth):
-            return True
-    return False
+    return engine.ids(grid, start.index, end.index, max_depth, observer)
 
-def ida(draw: callable, grid: Grid, start: Spot, end: Spot, initial_threshold: float) -> bool:
+def ida(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, initial_threshold: float,
+        heuristic: callable = None) -> SearchResult:
     """
     Iterative Deepening A* (IDA*) Algorithm.
     Args:
-        draw (callable): A function to call to update the Pygame window.
+        observer (SearchObserver): Notified of every step of the search.
         grid (Grid): The Grid object containing the spots.
         start (Spot): The starting spot.
         end (Spot): The ending spot.
         initial_threshold (float): The initial threshold for the f-cost.
+        heuristic (callable): Estimates the cost between two (row, col) positions (by default, the one matching the moves of the grid).
     Returns:
-        bool: True if a path is found, False otherwise.
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
     """
-    def search(current: Spot, g_score: float, threshold: float, came_from: dict, path_set: set):
-        f_score = g_score + h_manhattan_distance(current.get_position(), end.get_position())
-        if f_score > threshold:
-            return False, f_score
-
-        if current == end:
-            return True, f_score
-
-        min_threshold = float('inf')
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        for neighbor in current.neighbors:
-            if neighbor.is_barrier() or neighbor in path_set:
-                continue
-
-            path_set.add(neighbor)
-            came_from[neighbor] = current
-
-            neighbor.make_open()
-            draw()
-
-            found, new_threshold = search(neighbor, g_score + 1, threshold, came_from, path_set)
-            if found:
-                return True, new_threshold
-
-            path_set.remove(neighbor)
+    return engine.ida(grid, start.index, end.index, initial_threshold, observer, heuristic)
 
-            if new_threshold < min_threshold:
-                min_threshold = new_threshold
-
-        if current != start:
-            current.make_closed()
-            draw()
-
-        return False, min_threshold
-
-    threshold = initial_threshold
-    came_from = {}
-    path_set = {start}
-
-    while True:
-        found, new_threshold = search(start, 0, threshold, came_from, path_set)
-        if found:
-            # Reconstruct path
-            current = end
-            while current in came_from:
-                current = came_from[current]
-                current.make_path()
-                draw()
-            end.make_end()
-            start.make_start()
-            return True
-
-        if new_threshold == float('inf'):
-            return False
-
-        threshold = new_threshold
\ No newline at end of file
+def lpa_star(observer: SearchObserver, grid: Grid, start: Spot, end: Spot, planner: LPAStar) -> SearchResult:
+    """
+    Lifelong Planning A* (LPA*) Algorithm: an A* that only repairs what changed since its previous run.
+    Args:
+        observer (SearchObserver): Notified of every step of the search.
+        grid (Grid): The Grid object containing the spots.
+        start (Spot): The starting spot.
+        end (Spot): The ending spot.
+        planner (LPAStar): The planner of this start and end, kept between runs.
+    Returns:
+        SearchResult: The result of the search (truthy if a path is found); its path holds cell indices.
+    """
+    return planner.plan(observer)
+
+class RacePane:
+    def __init__(self, name: str, grid: Grid, caption: pygame.Rect, algorithm: callable, options: dict,
+                 start: int, end: int):
+        """
+        One algorithm of a race: its own copy of the grid, drawn on a part of the window, and its search running on a
+        worker thread.
+        Args:
+            name (str): The name of the algorithm.
+            grid (Grid): The copy of the grid the algorithm searches, drawn on a subsurface of the window.
+            caption (pygame.Rect): The area of the window above the grid where the name and results are written.
+            algorithm (callable): One of the functions of this module.
+            options (dict): Its extra arguments.
+            start (int): The starting cell.
+            end (int): The ending cell.
+        """
+        self.name: str = name
+        self.grid: Grid = grid
+        self.caption: pygame.Rect = caption
+        # the CPU time of the search thread: the panes run at once and share the interpreter, so wall time would add up
+        self.elapsed: float = 0.0
+        self._algorithm: callable = algorithm
+        self._options: dict = options
+        self._start: Spot = grid.spot_at(start)
+        self._end: Spot = grid.spot_at(end)
+        self._shown: str | None = None  # the caption on the window
+        recorder = Recorder(start, end)
+        self.animation: Animation = Animation(grid, recorder.events, SearchThread(self._search, recorder))
+
+    def _search(self, observer: SearchObserver) -> SearchResult:
+        began = thread_time()
+        try:
+            return self._algorithm(observer, self.grid, self._start, self._end, **self._options)
+        finally:
+            self.elapsed = thread_time() - began
+
+    def result(self) -> RaceResult:
+        """
+        Get the outcome of the search, once it is finished.
+        Returns:
+            RaceResult: Its result, time and error, if any.
+        """
+        task = self.animation.task
+        return RaceResult(self.name, task.result, self.elapsed, None if task.error is None else str(task.error))
+
+    def caption_text(self) -> str:
+        """
+        Get the caption of the pane: the name of the algorithm, and its results once its search was played back.
+        Returns:
+            str: The caption.
+        """
+        if not self.animation.done:
+            return f"{self.name}: searching..."
+        entry = self.result()
+        if entry.error is not None:
+            return f"{self.name}: {entry.error}"
+        path = f"path {entry.path_length}" if entry.result else "no path"
+        return f"{self.name}: {entry.expanded} expanded, {path}, {entry.elapsed * 1000:.1f} ms"
+
+class Race:
+    # the height of the caption above every pane, in pixels
+    CAPTION_HEIGHT = 22
+
+    def __init__(self, win: pygame.Surface, area: pygame.Rect, grid: Grid, start: Spot, end: Spot,
+                 entrants: list[tuple[str, callable, callable]], font: pygame.font.Font):
+        """
+        Runs up to four algorithms at once on independent copies of a grid, each one shown in its own pane.
+        It is played back like an Animation: advance() every frame, until done.
+        Args:
+            win (pygame.Surface): The Pygame window.
+            area (pygame.Rect): The part of the window split into 2x2 panes.
+            grid (Grid): The grid to copy (its search colors are not copied).
+            start (Spot): The starting spot.
+            end (Spot): The ending spot.
+            entrants (list[tuple[str, callable, callable]]): The (name, algorithm, options) of every algorithm: a
+                function of this module, and a function giving its extra arguments for the copy of the grid it searches.
+            font (pygame.font.Font): The font of the captions.
+        """
+        self.win: pygame.Surface = win
+        self.area: pygame.Rect = area
+        self.font: pygame.font.Font = font
+        self.panes: list[RacePane] = []
+        self._painted: bool = False  # the background of the area was painted
+
+        width, height = area.width // 2, area.height // 2
+        for slot, (name, algorithm, options) in enumerate(entrants[:4]):
+            x, y = area.x + (slot % 2) * width, area.y + (slot // 2) * height
+            side = min(width, height - self.CAPTION_HEIGHT) - 2  # a 2 pixel gap between the panes
+            copy = Grid(win.subsurface((x, y + self.CAPTION_HEIGHT, side, side)), grid.rows, grid.cols, side, side)
+            copy.copy_layout(grid)
+            copy.build_adjacency()
+            if grid.components is not None:
+                ComponentIndex(copy)
+            caption = pygame.Rect(x, y, side, self.CAPTION_HEIGHT)
+            self.panes.append(RacePane(name, copy, caption, algorithm, options(copy), start.index, end.index))
+
+    @property
+    def done(self) -> bool:
+        return all(pane.animation.done for pane in self.panes)
+
+    def advance(self, steps: int | None) -> None:
+        """
+        Play the next steps of every search (see Animation.advance).
+        Args:
+            steps (int | None): The steps played in every pane, or None to play the searches to the end.
+        Returns:
+            None
+        """
+        for pane in self.panes:
+            pane.animation.advance(steps)
+
+    def pause(self) -> None:
+        for pane in self.panes:
+            pane.animation.pause()
+
+    def resume(self) -> None:
+        for pane in self.panes:
+            pane.animation.resume()
+
+    def cancel(self) -> None:
+        for pane in self.panes:
+            pane.animation.cancel()
+
+    def draw_changes(self) -> list[pygame.Rect]:
+        """
+        Repaint what changed in every pane since the last call, and the captions.
+        Returns:
+            list[pygame.Rect]: The repainted areas of the window, to give to pygame.display.update.
+        """
+        rects = []
+        if not self._painted:
+            self._painted = True
+            self.win.fill(COLORS2['GRID_LINES'], self.area)
+            rects.append(self.area)
+
+        for pane in self.panes:
+            offset = pane.grid.win.get_abs_offset()
+            rects.extend(rect.move(offset) for rect in pane.grid.draw_changes())
+            text = pane.caption_text()
+            if text != pane._shown:
+                pane._shown = text
+                self.win.fill((220, 220, 220), pane.caption)
+                self.win.blit(self.font.render(text, True, (0, 0, 0)), (pane.caption.x + 4, pane.caption.y + 2))
+                rects.append(pane.caption)
+        return rects
+
+    def report(self) -> str:
+        """
+        Compare the algorithms once the race is over.
+        Returns:
+            str: A table of their expanded cells, path lengths, costs and times (see race.race_report).
+        """
+        return race_report([pane.result() for pane in self.panes])
@@ -1,31 +1,70 @@
 from utils import *
+from compact_grid import UNVISITED, BARRIER, START, END, OPEN, CLOSED, PATH, STATE_NAMES, DEFAULT_COST, MAX_COST
+
+# color of every state, indexed by the state value stored in the grid
+STATE_COLORS = tuple(COLORS2[name] for name in STATE_NAMES)
+
+def _shade(low: int, high: int, t: float) -> int:
+    """
+    Blend two hex colors: t = 0 gives `low`, t = 1 gives `high`.
+    """
+    return sum(round(((low >> shift) & 0xFF) * (1 - t) + ((high >> shift) & 0xFF) * t) << shift for shift in (16, 8, 0))
+
+# color of an unvisited cell of every cost, indexed by the cost stored in the grid
+TERRAIN_COLORS = tuple(
+    _shade(COLORS2['UNVISITED'], COLORS2['TERRAIN'], min(max(cost - DEFAULT_COST, 0) / (MAX_BRUSH_COST - DEFAULT_COST), 1))
+    for cost in range(MAX_COST + 1)
+)
 
 class Spot:
+    # a spot holds no data of its own: it is a small view on one cell of the grid's state plane,
+    # created on demand by Grid.spot() for the GUI
+    __slots__ = ('grid', 'row', 'col', 'index')
+
     # --- Constructor ---
-    def __init__(self, row: int, col: int, width: int, height: int, total_rows: int):
+    def __init__(self, grid: "Grid", row: int, col: int):
         """
-        Initialize a spot in the grid.
-        Args: 
+        Initialize a view on a spot in the grid.
+        Args:
+            grid (Grid): The grid the spot belongs to.
             row (int): The row index of the spot.
             col (int): The column index of the spot.
-            width (int): The width of the spot.
-            height (int): The height of the spot.
-            total_rows (int): Keeps track of the total number of rows in the grid (while avoiding global variables).
         """
         # a square has a position in the grid (row, col) and a position in the window (x, y)
+        self.grid: "Grid" = grid
         self.row: int = row
         self.col: int = col
-        # a square has also a width and a height
-        # the coordinates (x, y) are calculated based on the place inside the grid and its size.
-        self.width: int = width
-        self.height: int = height
-        self.x: int = row * width
-        self.y: int = col * height
-        self.color: tuple = COLORS2["UNVISITED"]  # default color is white
-        self.neighbors: list = []
-        self.total_rows: int = total_rows
+        self.index: int = grid.index(row, col)  # the cell of the spot in the grid's state plane
 
-    # ---- Methods to change the state of the spot (i.e., its setters) ----
+    # ---- Geometry (computed from the grid) ----
+    @property
+    def width(self) -> int:
+        return self.grid.width // self.grid.rows
+
+    @property
+    def height(self) -> int:
+        return self.grid.height // self.grid.cols
+
+    @property
+    def x(self) -> int:
+        return self.row * self.width
+
+    @property
+    def y(self) -> int:
+        return self.col * self.height
+
+    @property
+    def color(self) -> int:
+        state = self.grid.state[self.index]
+        if state == UNVISITED:
+            return TERRAIN_COLORS[self.grid.cost[self.index]]
+        return STATE_COLORS[state]
+
+    @property
+    def cost(self) -> int:
+        return self.grid.cost[self.index]
+
+    # ---- Methods to get the state of the spot (i.e., its getters) ----
     def get_position(self) -> tuple[int, int]:
         """
         Gets the (row, col) position of the spot in the grid.
@@ -40,7 +79,7 @@ class Spot:
         Returns:
             bool: True if the spot is closed, False otherwise.
         """
-        return self.color == COLORS2['CLOSED']
+        return self.grid.state[self.index] == CLOSED
 
     def is_open(self) -> bool:
         """
@@ -48,7 +87,7 @@ class Spot:
         Returns:
             bool: True if the spot is marked as open, False otherwise.
         """
-        return self.color == COLORS2['OPEN']
+        return self.grid.state[self.index] == OPEN
 
     def is_barrier(self) -> bool:
         """
@@ -56,7 +95,7 @@ class Spot:
         Returns:
             bool: True if the spot is a barrier, False otherwise.
         """
-        return self.color == COLORS2['BARRIER']
+        return self.grid.state[self.index] == BARRIER
 
     def is_start(self) -> bool:
         """
@@ -64,7 +103,7 @@ class Spot:
         Returns:
             bool: True if the spot is the start node, False otherwise.
         """
-        return self.color == COLORS2['START']
+        return self.grid.state[self.index] == START
 
     def is_end(self) -> bool:
         """
@@ -72,7 +111,7 @@ class Spot:
         Returns:
             bool: True if the spot is the end node, False otherwise.
         """
-        return self.color == COLORS2['END']
+        return self.grid.state[self.index] == END
 
     # ---- Methods to change the state of the spot (i.e., its setters) ----
     def reset(self) -> None:
@@ -81,7 +120,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['UNVISITED']
+        self.grid.set_state(self.index, UNVISITED)
 
     def make_closed(self) -> None:
         """
@@ -89,7 +128,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['CLOSED']
+        self.grid.set_state(self.index, CLOSED)
 
     def make_open(self) -> None:
         """
@@ -97,7 +136,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['OPEN']
+        self.grid.set_state(self.index, OPEN)
 
     def make_barrier(self) -> None:
         """
@@ -105,7 +144,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['BARRIER']
+        self.grid.set_state(self.index, BARRIER)
 
     def make_start(self) -> None:
         """
@@ -113,7 +152,7 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['START']
+        self.grid.set_state(self.index, START)
 
     def make_end(self) -> None:
         """
@@ -121,7 +160,17 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['END']
+        self.grid.set_state(self.index, END)
+
+    def set_cost(self, cost: int) -> None:
+        """
+        Set the cost of moving into the spot.
+        Args:
+            cost (int): The new cost, from 1 (plain ground) to 255.
+        Returns:
+            None
+        """
+        self.grid.set_cost(self.index, cost)
 
     def make_path(self) -> None:
         """
@@ -129,9 +178,16 @@ class Spot:
         Returns:
             None
         """
-        self.color = COLORS2['PATH']
+        self.grid.set_state(self.index, PATH)
 
     # --- Operators ---
+    # Two views are the same spot when they look at the same cell of the same grid.
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Spot) and self.grid is other.grid and self.index == other.index
+
+    def __hash__(self) -> int:
+        return self.index
+
     # "Spot" type is not yet defined because the class will be defined at runtime and will exist only after it is closed (the whole class).
     # So we use quotes to tell the type checker that this is a string, containing the name of a type that will exist later.
     def __lt__(self, other: "Spot") -> bool:
@@ -140,7 +196,7 @@ class Spot:
         This is used to avoid errors in data structures that require comparison, like PriorityQueue.
         """
         return False
-    
+
     # --- Other Methods ---
     def draw(self, win: pygame.Surface) -> None:
         """
@@ -150,25 +206,3 @@ class Spot:
         """
         # draw a rectangle at (x, y) with size (width, width) and color self.color
         pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
-
-    def update_neighbors(self, grid: list[list["Spot"]]) -> None:
-        """
-        Update the list of neighbor spots that are not barriers.
-        Args:
-            grid (list[list[Spot]]): The 2D list (matrix) representing the grid of Spot objects.
-        Returns:
-            None
-        """
-        self.neighbors = []
-        # DOWN
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row + 1][self.col])
-        # UP
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row - 1][self.col])
-        # RIGHT
-        if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col + 1])
-        # LEFT
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col - 1])
@@ -0,0 +1,42 @@
+import math
+import random
+import engine
+from compact_grid import CompactGrid, BARRIER, UNVISITED
+from incremental import LPAStar
+
+def _assert_matches_dijkstra(planner: LPAStar, grid: CompactGrid) -> None:
+    result = planner.plan()
+    expected = engine.dijkstra(grid, planner.start, planner.end)
+    assert result.found == expected.found
+    if expected.found:
+        assert math.isclose(result.cost, expected.cost, abs_tol=1e-9)
+        assert result.path[0] == planner.start and result.path[-1] == planner.end
+
+def _replan(rows: int, cols: int, corner_cutting: bool, start: int, end: int, changes: list[tuple]) -> None:
+    grid = CompactGrid(rows, cols, connectivity=8, corner_cutting=corner_cutting)
+    grid.build_adjacency()
+    planner = LPAStar(grid, start, end)
+    _assert_matches_dijkstra(planner, grid)
+    for change in changes:
+        if change[0] == 'toggle':
+            grid.set_state(change[1], UNVISITED if grid.is_barrier(change[1]) else BARRIER)
+        else:
+            grid.set_cost(change[1], change[2])
+        _assert_matches_dijkstra(planner, grid)
+
+def test_replan_with_diagonal_costs():
+    # float sums of sqrt(2) used to stop the repair one rounding error too early
+    _replan(4, 4, False, 13, 3, [('toggle', 15), ('cost', 10, 4), ('cost', 9, 5)])
+    _replan(6, 6, True, 23, 0, [('toggle', 3), ('toggle', 14), ('toggle', 15), ('cost', 9, 2)])
+
+def test_replan_matches_dijkstra_on_random_8_connected_grids():
+    for seed in range(300):
+        rng = random.Random(seed)
+        rows, cols = rng.randint(3, 8), rng.randint(3, 8)
+        start, end = rng.sample(range(rows * cols), 2)
+        changes = []
+        for cell in rng.sample(range(rows * cols), 4):
+            if cell in (start, end):
+                continue
+            changes.append(('toggle', cell) if rng.random() < 0.7 else ('cost', cell, rng.randint(1, 5)))
+        _replan(rows, cols, rng.random() < 0.5, start, end, changes)
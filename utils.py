@@ -3,7 +3,7 @@ import pygame
 WIDTH = 800
 HEIGHT = 800
 
-INTERFACE_HEIGHT = 80
+INTERFACE_HEIGHT = 115
 
 # colors as hex values
 COLORS2 = {
@@ -15,4 +15,10 @@ COLORS2 = {
     'BARRIER': 0x031926,          # barrier
     'PATH': 0x84DCC6,             # path
     'GRID_LINES': 0x595358,       # grid lines
-}
\ No newline at end of file
+    'TERRAIN': 0x9C7A3C,          # unvisited nodes of the highest brush cost (lower costs are shaded towards UNVISITED)
+}
+
+# the highest cost painted by the terrain brush (keys 1 to 9 select the cost)
+MAX_BRUSH_COST = 9
+# frames per second of the window; searches are played back a number of steps per frame (see animation.py)
+FPS = 60
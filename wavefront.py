@@ -0,0 +1,139 @@
+import numpy as np
+from compact_grid import BARRIER
+from engine import SearchObserver, SearchResult, _disconnected, _path_found, _not_found
+from scratch import SearchScratch
+
+# Breadth-first search as a wavefront: every layer of the search (the cells at the same number of moves from the
+# source) is expanded at once with NumPy, instead of popping one cell at a time in Python.
+# The barrier plane is padded with a border of barriers, so the neighbors of a cell are found by adding the same
+# offsets to every index of the frontier, with no wrapping around the edges of the map.
+# Each layer costs O(size of the frontier), not O(size of the map): on open maps a million-cell distance field takes
+# well under a second, over ten times faster than the queue of distance_field. Long, thin corridors (mazes) have
+# many small layers and gain much less.
+# This module requires NumPy.
+
+def _free_plane(grid) -> np.ndarray:
+    """
+    Get the flat walkable plane of a grid, padded with a border of barriers.
+    """
+    free = np.zeros((grid.rows + 2, grid.cols + 2), dtype=bool)
+    free[1:-1, 1:-1] = grid.state_array() != BARRIER
+    return free.ravel()
+
+def _diagonals(grid, width: int) -> list[tuple[int, int, int]]:
+    """
+    Get the (offset, side_a, side_b) of every diagonal move on the padded plane: the move itself and the two
+    orthogonal cells it passes between.
+    """
+    if grid.connectivity != 8:
+        return []
+    return [(d_row * width + d_col, d_row * width, d_col) for d_row in (-1, 1) for d_col in (-1, 1)]
+
+def _propagate(grid, source: int, target: int | None = None,
+               observer: SearchObserver | None = None) -> tuple[np.ndarray, int]:
+    """
+    Expand the wavefront from `source` until every reachable cell, or `target`, has its distance.
+    Args:
+        grid (CompactGrid): The grid to search.
+        source (int): The cell the distances are measured from.
+        target (int | None): Stop once this cell is reached, or None to cover the whole grid.
+        observer (SearchObserver | None): Optional observer notified of every opened and expanded cell.
+    Returns:
+        tuple[np.ndarray, int]: The distances on the padded plane (-1 where not reached) and the number of expanded cells.
+    """
+    width = grid.cols + 2
+    free = _free_plane(grid)
+    orthogonals = np.array((-width, width, -1, 1), dtype=np.intp)
+    diagonals = _diagonals(grid, width)
+    corner_cutting = grid.corner_cutting
+
+    distance = np.full(free.size, -1, dtype=np.int32)
+    padded_source = (source // grid.cols + 1) * width + source % grid.cols + 1
+    padded_target = None if target is None else (target // grid.cols + 1) * width + target % grid.cols + 1
+    distance[padded_source] = 0
+    # the walkable cells not reached yet, and the position of each cell in its candidate list (to drop duplicates)
+    unreached = free.copy()
+    unreached[padded_source] = False
+    slot = np.empty(free.size, dtype=np.intp)
+    frontier = np.array([padded_source], dtype=np.intp)
+    depth = 0
+    expanded = 0
+
+    while frontier.size and (padded_target is None or distance[padded_target] < 0):
+        depth += 1
+        expanded += frontier.size
+        candidates = [(frontier[:, None] + orthogonals).ravel()]
+        for offset, side_a, side_b in diagonals:
+            free_a, free_b = free[frontier + side_a], free[frontier + side_b]
+            allowed = free_a | free_b if corner_cutting else free_a & free_b
+            candidates.append(frontier[allowed] + offset)
+        candidates = np.concatenate(candidates) if diagonals else candidates[0]
+        candidates = candidates[unreached[candidates]]
+        # a cell reached from several cells of the frontier is kept once: the last write to its slot wins
+        positions = np.arange(candidates.size)
+        slot[candidates] = positions
+        layer = candidates[slot[candidates] == positions]
+        unreached[layer] = False
+        distance[layer] = depth
+
+        if observer is not None:
+            for cell in _unpad(layer, width):
+                observer.on_open(cell)
+            for cell in _unpad(frontier, width):
+                observer.on_expand(cell)
+        frontier = layer
+
+    return distance, expanded
+
+def _unpad(cells: np.ndarray, width: int) -> list[int]:
+    """
+    Convert indices of the padded plane back into cells of the grid.
+    """
+    rows, cols = np.divmod(cells, width)
+    return ((rows - 1) * (width - 2) + cols - 1).tolist()
+
+def wavefront_distances(grid, source: int) -> np.ndarray:
+    """
+    Compute the number of moves from `source` to every cell of the grid, one whole BFS layer at a time.
+    Args:
+        grid (CompactGrid): The grid to search.
+        source (int): The cell the distances are measured from.
+    Returns:
+        np.ndarray: The int32 distance of every cell, indexed by cell (-1 for barriers and cut-off cells).
+    """
+    distance, _ = _propagate(grid, source)
+    return distance.reshape(grid.rows + 2, grid.cols + 2)[1:-1, 1:-1].ravel()
+
+def bfs(grid, start: int, end: int, observer: SearchObserver | None = None,
+        scratch: SearchScratch | None = None) -> SearchResult:
+    """
+    Breadth-First Search (BFS) Algorithm, expanding one whole layer at a time.
+    It finds a path with as few moves as engine.bfs, although not always the same one.
+    Args:
+        grid (CompactGrid): The grid to search.
+        start (int): The starting cell.
+        end (int): The ending cell.
+        observer (SearchObserver | None): Optional observer notified while the search runs.
+        scratch (SearchScratch | None): Unused: the layers are kept in NumPy arrays. Accepted so the function can be
+            given to solve_batch and solve_parallel like the searches of engine.py.
+    Returns:
+        SearchResult: The path, its cost and the number of expanded cells.
+    """
+    if _disconnected(grid, start, end):
+        return _not_found(observer, 0)
+    distance, expanded = _propagate(grid, start, end, observer)
+    width = grid.cols + 2
+    padded_end = (end // grid.cols + 1) * width + end % grid.cols + 1
+    depth = int(distance[padded_end])
+    if depth < 0:
+        return _not_found(observer, expanded)
+
+    # walk back from the end through neighbors one move closer to the start
+    distance = distance.reshape(grid.rows + 2, grid.cols + 2)[1:-1, 1:-1].ravel()
+    path = [end]
+    for step in range(depth - 1, 0, -1):
+        path.append(next(neighbor for neighbor in grid.neighbors(path[-1]) if distance[neighbor] == step))
+    if depth:
+        path.append(start)
+    path.reverse()
+    return _path_found(observer, path, depth, expanded)